@@ -1,12 +1,17 @@
 # backend/app/auth_utils.py
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import os
+import threading
+import time
+from typing import Optional
 from dotenv import load_dotenv
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.supabase_client import supabase
+from app.data_access import db
+from app.utils.metrics import Gauge
 
 load_dotenv()
 
@@ -15,6 +20,90 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+class UserCache:
+    """
+    Bounded LRU cache of user rows with a per-entry TTL, keyed by user id.
+    Entries are dropped explicitly via `invalidate` when a profile changes.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.local_jwt = 0
+        self.jwt_db = 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id: str, user: dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def count_local_jwt(self):
+        with self._lock:
+            self.local_jwt += 1
+
+    def count_jwt_db(self):
+        with self._lock:
+            self.jwt_db += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "local_jwt": self.local_jwt,
+                "jwt_db": self.jwt_db,
+            }
+
+
+# User rows are cached for every token type, JWTs included: a JWT's claims
+# identify the user, but the profile is still read from here (or the DB on a
+# miss) so PATCH /auth/me is visible before the token expires
+user_cache = UserCache(
+    max_size=int(os.getenv("USER_CACHE_MAX_SIZE", 1024)),
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", 60)),
+)
+
+
+USER_CACHE = Gauge(
+    "mockint_user_cache", "User cache size and lookup counts since start; local_jwt counts JWTs verified locally, jwt_db those that still missed the cache and read the DB.",
+    ["stat"], fn=lambda: [({"stat": name}, value) for name, value in user_cache.stats().items()],
+)
+
+
+def invalidate_user(user_id):
+    user_cache.invalidate(str(user_id))
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -30,28 +119,56 @@ def decode_token(token: str):
     except JWTError:
         raise ValueError("Invalid token")
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def resolve_user(token: str) -> dict:
+    """
+    Resolve a bearer token (demo `token_<id>` or JWT) to the stored user row.
+    Raises HTTPException(401) when the token or user is invalid.
+
+    JWTs are verified locally, but the row still comes from the user cache, so
+    a JWT request reads the users table on a cache miss (first request, after
+    USER_CACHE_TTL_SECONDS, or after a profile change). This keeps profile
+    edits and tenant changes current instead of serving claims until expiry.
+    """
     try:
-        token = credentials.credentials
-        
         # For demo purposes, extract user ID from simple token format
         if token.startswith("token_"):
             user_id = token.replace("token_", "")
         else:
             # Try to decode as JWT
+            # The signature is verified locally, which drops the per-request
+            # DB lookup only while the user row is cached; a miss reads the DB below
             payload = decode_token(token)
             user_id = payload.get("sub")
+            if user_id:
+                user_cache.count_local_jwt()
         
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
         
+        user_id = str(user_id)
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         # Fetch user from database
-        response = supabase.table("users").select("*").eq("id", user_id).execute()
+        if not token.startswith("token_"):
+            user_cache.count_jwt_db()
+        rows = await db.select("users", filters={"id": user_id}, limit=1)
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=401, detail="User not found")
         
-        return response.data[0]
+        user_cache.set(user_id, rows[0])
+        return rows[0]
         
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await resolve_user(credentials.credentials)
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Like get_current_user, but returns None for anonymous requests."""
+    if credentials is None:
+        return None
+    return await resolve_user(credentials.credentials)
@@ -11,4 +11,127 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
     DATABASE_URL = os.getenv("DATABASE_URL")
 
+    # Pooled keep-alive HTTP connections to the Supabase REST API
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 20))
+    DB_MAX_KEEPALIVE = int(os.getenv("DB_MAX_KEEPALIVE", 10))
+    DB_TIMEOUT_SECONDS = float(os.getenv("DB_TIMEOUT_SECONDS", 10))
+
+    # Models loaded and warmed in the background at startup ("" to load on first use only).
+    # /ready reports 503 until all of them are warm.
+    MODEL_WARMUP = [m.strip() for m in os.getenv("MODEL_WARMUP", "emotion,asr").split(",") if m.strip()]
+
+    # Prometheus-format /metrics and sampled structured event logs (0-1 of events kept)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.1))
+
+    # Upload limits (bytes); request bodies above MAX_REQUEST_BYTES are refused before parsing
+    MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", 5 * 1024 * 1024))
+    MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", 25 * 1024 * 1024))
+    MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", 26 * 1024 * 1024))
+    # Shortest side to keep when JPEG frames are decoded at reduced scale (0 = full size)
+    EMOTION_DECODE_MIN_SIDE = int(os.getenv("EMOTION_DECODE_MIN_SIDE", 240))
+
+    # Face emotion backend: "deepface", "fer", "onnx" (ONNX Runtime, CPU) or "remote" (model server)
+    EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "deepface")
+    FER_MTCNN = os.getenv("FER_MTCNN", "true").lower() == "true"
+    EMOTION_ONNX_DETECTOR = os.getenv("EMOTION_ONNX_DETECTOR")  # e.g. models/version-RFB-320.onnx
+    EMOTION_ONNX_CLASSIFIER = os.getenv("EMOTION_ONNX_CLASSIFIER")  # e.g. models/emotion-ferplus-8.onnx
+    EMOTION_ONNX_FACE_THRESHOLD = float(os.getenv("EMOTION_ONNX_FACE_THRESHOLD", 0.7))
+    ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", 0))  # 0 = ONNX Runtime default
+    ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", 0))
+
+    # Shared model server (python -m app.model_server). API workers use it with
+    # EMOTION_BACKEND=remote / ASR_BACKEND=remote; the server itself runs the
+    # MODEL_SERVER_*_BACKEND engines. ADDRESS is a Unix socket path or host:port.
+    # The channel carries pickles, so AUTHKEY is required (a long random secret)
+    # and TCP is limited to loopback unless ALLOW_REMOTE is set. Shared memory
+    # only works on one host; remote clients fall back to sending arrays inline.
+    MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS", "/tmp/mockint-models.sock")
+    MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY")
+    MODEL_SERVER_ALLOW_REMOTE = os.getenv("MODEL_SERVER_ALLOW_REMOTE", "false").lower() == "true"
+    MODEL_SERVER_SHM_MB = int(os.getenv("MODEL_SERVER_SHM_MB", 32))
+    MODEL_SERVER_EMOTION_BACKEND = os.getenv("MODEL_SERVER_EMOTION_BACKEND", "deepface")
+    MODEL_SERVER_ASR_BACKEND = os.getenv("MODEL_SERVER_ASR_BACKEND", "sphinx")
+
+    # Emotion inference micro-batching
+    EMOTION_BATCH_WINDOW_MS = float(os.getenv("EMOTION_BATCH_WINDOW_MS", 20))
+    EMOTION_MAX_BATCH_SIZE = int(os.getenv("EMOTION_MAX_BATCH_SIZE", 16))
+
+    # Admission control for the inference queues (0 disables a limit). Requests
+    # beyond the queue bound get 503, beyond the per-user bound 429, and queued
+    # work older than the deadline is dropped. Once a queue is more than
+    # INFERENCE_DEGRADE_LOAD full, requests run in a cheaper mode.
+    EMOTION_MAX_QUEUE = int(os.getenv("EMOTION_MAX_QUEUE", 64))
+    EMOTION_MAX_PER_USER = int(os.getenv("EMOTION_MAX_PER_USER", 4))
+    EMOTION_DEADLINE_MS = float(os.getenv("EMOTION_DEADLINE_MS", 2000))
+    ASR_MAX_QUEUE = int(os.getenv("ASR_MAX_QUEUE", 32))
+    ASR_MAX_PER_USER = int(os.getenv("ASR_MAX_PER_USER", 2))
+    ASR_DEADLINE_MS = float(os.getenv("ASR_DEADLINE_MS", 15000))
+    INFERENCE_DEGRADE_LOAD = float(os.getenv("INFERENCE_DEGRADE_LOAD", 0.5))
+    # Smaller Whisper model used while the ASR queue is degraded ("" keeps the main model);
+    # warmed in the background at startup, and only used once warm
+    WHISPER_DEGRADED_MODEL_SIZE = os.getenv("WHISPER_DEGRADED_MODEL_SIZE", "tiny")
+
+    # Burst/clip analysis (POST /detect_emotion/clip): sampling rate bounds and
+    # the most frames scored per request
+    CLIP_DEFAULT_FPS = float(os.getenv("CLIP_DEFAULT_FPS", 2.0))
+    CLIP_MAX_FPS = float(os.getenv("CLIP_MAX_FPS", 10.0))
+    CLIP_MAX_FRAMES = int(os.getenv("CLIP_MAX_FRAMES", 120))
+    MAX_CLIP_UPLOAD_BYTES = int(os.getenv("MAX_CLIP_UPLOAD_BYTES", 20 * 1024 * 1024))
+
+    # Face tracking between frames: full detection every N frames, or sooner when
+    # confidence falls by more than the drop (0-1) since the last detection
+    FACE_TRACKING_ENABLED = os.getenv("FACE_TRACKING_ENABLED", "true").lower() == "true"
+    FACE_REDETECT_EVERY = int(os.getenv("FACE_REDETECT_EVERY", 10))
+    FACE_ROI_PADDING = float(os.getenv("FACE_ROI_PADDING", 0.15))
+    FACE_REDETECT_CONFIDENCE_DROP = float(os.getenv("FACE_REDETECT_CONFIDENCE_DROP", 0.2))
+
+    # Per-session cache of emotion results for near-identical frames (dHash,
+    # Hamming distance out of 64 bits)
+    FRAME_CACHE_ENABLED = os.getenv("FRAME_CACHE_ENABLED", "true").lower() == "true"
+    FRAME_CACHE_SIZE = int(os.getenv("FRAME_CACHE_SIZE", 16))
+    FRAME_CACHE_MAX_DISTANCE = int(os.getenv("FRAME_CACHE_MAX_DISTANCE", 4))
+    FRAME_CACHE_MAX_AGE_SECONDS = float(os.getenv("FRAME_CACHE_MAX_AGE_SECONDS", 10))
+
+    # Per-interview live sessions, held in process memory (one worker, or sticky
+    # routing by interview id). Idle sessions are flushed and the rest
+    # checkpointed to their interview row every SWEEP_INTERVAL.
+    EMOTION_CONFIDENCE_ALPHA = float(os.getenv("EMOTION_CONFIDENCE_ALPHA", 0.3))
+    SESSION_IDLE_TIMEOUT_SECONDS = int(os.getenv("SESSION_IDLE_TIMEOUT_SECONDS", 600))
+    SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", 60))
+    SESSION_DEFAULT_SAMPLE_SECONDS = float(os.getenv("SESSION_DEFAULT_SAMPLE_SECONDS", 2.0))
+    SESSION_MAX_SAMPLE_SECONDS = float(os.getenv("SESSION_MAX_SAMPLE_SECONDS", 5.0))
+    # Grid spacing of stored confidence time series
+    CONFIDENCE_SERIES_PERIOD_SECONDS = float(os.getenv("CONFIDENCE_SERIES_PERIOD_SECONDS", 1.0))
+
+    # Audio decoding: "memory" pipes uploads through an in-memory decoder,
+    # "tempfile" forces the legacy write/convert/read-back path
+    AUDIO_DECODE_MODE = os.getenv("AUDIO_DECODE_MODE", "memory")
+    # Warm decoder worker processes (0 disables the pool)
+    AUDIO_DECODER_POOL_SIZE = int(os.getenv("AUDIO_DECODER_POOL_SIZE", 2))
+    AUDIO_DECODER_TIMEOUT_SECONDS = float(os.getenv("AUDIO_DECODER_TIMEOUT_SECONDS", 10))
+    AUDIO_DECODER_HEALTH_INTERVAL_SECONDS = float(os.getenv("AUDIO_DECODER_HEALTH_INTERVAL_SECONDS", 30))
+
+    # Speech recognition backend: "sphinx", "whisper" (faster-whisper) or "remote" (model server)
+    ASR_BACKEND = os.getenv("ASR_BACKEND", "sphinx")
+    WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+    WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")  # int8 | int8_float16 | float32
+    WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", 0))  # 0 = CTranslate2 default
+    WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", 1))
+    ASR_BATCH_WINDOW_MS = float(os.getenv("ASR_BATCH_WINDOW_MS", 50))
+    ASR_MAX_BATCH_SIZE = int(os.getenv("ASR_MAX_BATCH_SIZE", 8))
+
+    # Voice-activity gating before recognition
+    VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+    VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", 10))
+    VAD_ENERGY_FLOOR_DBFS = float(os.getenv("VAD_ENERGY_FLOOR_DBFS", -50))
+    VAD_MIN_SPEECH_MS = float(os.getenv("VAD_MIN_SPEECH_MS", 150))
+    VAD_PADDING_MS = float(os.getenv("VAD_PADDING_MS", 210))
+
+    # Most postings read per answer search (newest first)
+    ANSWER_SEARCH_MAX_POSTINGS = int(os.getenv("ANSWER_SEARCH_MAX_POSTINGS", 5000))
+
+    # Optional JSON file mapping tenant id (users.tenant_id) -> list of filler words
+    FILLER_LEXICON_FILE = os.getenv("FILLER_LEXICON_FILE")
+
 settings = Settings()
@@ -0,0 +1,169 @@
+# backend/app/data_access.py
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import httpx
+from app.config import settings
+from app.utils.metrics import Histogram
+
+DB_REQUEST_SECONDS = Histogram(
+    "mockint_db_request_seconds", "Supabase REST request latency.", ["method", "table", "status"]
+)
+
+Filters = Optional[Dict[str, Any]]
+
+
+class DataAccessError(RuntimeError):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Supabase request failed ({status_code}): {message}")
+        self.status_code = status_code
+
+
+class DataAccess:
+    """
+    Async access to the Supabase REST (PostgREST) API over one pooled,
+    keep-alive HTTP client shared by every router.
+
+    Filters are dicts of column -> value. A plain value means equality; a
+    tuple `(op, value)` uses any PostgREST operator, e.g. `("lt", ts)` or
+    `("in", [1, 2])`. `params` passes extra raw query parameters such as `or`.
+    """
+
+    def __init__(self, url: Optional[str], key: Optional[str], max_connections: int = 20,
+                 max_keepalive: int = 10, timeout: float = 10.0):
+        self.url = (url or "").rstrip("/")
+        self.key = key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self._transport = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def configure(self, url: Optional[str] = None, key: Optional[str] = None,
+                  transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Point the layer at another backend (e.g. an in-process stand-in). Call before `open`."""
+        if url is not None:
+            self.url = url.rstrip("/")
+        if key is not None:
+            self.key = key
+        self._transport = transport
+
+    async def open(self):
+        if self._client is not None:
+            return
+        if self._transport is None and (not self.url or not self.key):
+            raise ValueError("SUPABASE_URL or SUPABASE_KEY is missing!")
+        self._client = httpx.AsyncClient(
+            base_url=f"{self.url or 'http://supabase.local'}/rest/v1",
+            headers={"apikey": self.key or "", "Authorization": f"Bearer {self.key or ''}"},
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=30.0,
+            ),
+            timeout=self.timeout,
+            transport=self._transport,
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+
+    @classmethod
+    def _filter_params(cls, filters: Filters) -> List[Tuple[str, str]]:
+        params = []
+        for column, value in (filters or {}).items():
+            if isinstance(value, tuple):
+                op, operand = value
+                if op == "in":
+                    operand = "(" + ",".join(cls._format_value(v) for v in operand) + ")"
+                else:
+                    operand = cls._format_value(operand)
+                params.append((column, f"{op}.{operand}"))
+            elif value is None:
+                params.append((column, "is.null"))
+            else:
+                params.append((column, f"eq.{cls._format_value(value)}"))
+        return params
+
+    async def _request(self, method: str, table: str, params: Optional[List[Tuple[str, str]]] = None,
+                       json: Any = None, prefer: Optional[str] = None) -> httpx.Response:
+        if self._client is None:
+            await self.open()
+        headers = {"Prefer": prefer} if prefer else None
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, f"/{table}", params=params, json=json, headers=headers)
+        except httpx.HTTPError:
+            DB_REQUEST_SECONDS.observe(time.perf_counter() - started, method=method, table=table, status="error")
+            raise
+        DB_REQUEST_SECONDS.observe(time.perf_counter() - started, method=method, table=table,
+                                   status=response.status_code)
+        if response.status_code >= 400:
+            raise DataAccessError(response.status_code, response.text)
+        return response
+
+    async def select(self, table: str, columns: str = "*", filters: Filters = None, order: Optional[str] = None,
+                     limit: Optional[int] = None, offset: Optional[int] = None,
+                     params: Optional[Iterable[Tuple[str, str]]] = None) -> List[dict]:
+        query = [("select", columns)] + self._filter_params(filters) + list(params or [])
+        if order:
+            query.append(("order", order))
+        if limit is not None:
+            query.append(("limit", str(limit)))
+        if offset:
+            query.append(("offset", str(offset)))
+        response = await self._request("GET", table, params=query)
+        return response.json()
+
+    async def count(self, table: str, filters: Filters = None) -> int:
+        query = [("select", "*"), ("limit", "1")] + self._filter_params(filters)
+        response = await self._request("GET", table, params=query, prefer="count=exact")
+        content_range = response.headers.get("content-range", "")
+        total = content_range.rsplit("/", 1)[-1]
+        return int(total) if total.isdigit() else len(response.json())
+
+    async def insert(self, table: str, rows: Union[dict, List[dict]]) -> List[dict]:
+        response = await self._request("POST", table, json=rows, prefer="return=representation")
+        return response.json()
+
+    async def upsert(self, table: str, rows: Union[dict, List[dict]], on_conflict: str) -> List[dict]:
+        response = await self._request(
+            "POST", table,
+            params=[("on_conflict", on_conflict)],
+            json=rows,
+            prefer="resolution=merge-duplicates,return=representation",
+        )
+        return response.json()
+
+    async def update(self, table: str, values: dict, filters: Filters) -> List[dict]:
+        if not filters:
+            raise ValueError("Refusing to update without filters")
+        response = await self._request("PATCH", table, params=self._filter_params(filters), json=values,
+                                       prefer="return=representation")
+        return response.json()
+
+    async def delete(self, table: str, filters: Filters) -> List[dict]:
+        if not filters:
+            raise ValueError("Refusing to delete without filters")
+        response = await self._request("DELETE", table, params=self._filter_params(filters),
+                                       prefer="return=representation")
+        return response.json()
+
+
+db = DataAccess(
+    settings.SUPABASE_URL,
+    settings.SUPABASE_KEY,
+    max_connections=settings.DB_MAX_CONNECTIONS,
+    max_keepalive=settings.DB_MAX_KEEPALIVE,
+    timeout=settings.DB_TIMEOUT_SECONDS,
+)
@@ -1,10 +1,29 @@
-from fastapi import FastAPI, UploadFile, File
+import asyncio
+import logging
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.utils.emotion_detector import detect_emotion_from_image
+from starlette.concurrency import run_in_threadpool
+from app.utils.emotion_detector import analyze_frame, emotion_executor
+from app.utils.image import decode_image
+from app.utils.uploads import BodySizeLimitMiddleware, read_upload
+from app.utils.decoder_pool import shutdown_decoder_pool, warm_decoder_pool
+from app.utils.asr import asr_executor, degraded_warmup
+from app.utils.inference import Overloaded
+from app.utils.metrics import MetricsMiddleware, log_event, render as render_metrics, stage
 from app.routers.auth import router as auth_router
 from app.routers.interview import router as interview_router
 from app.routers.voice import router as voice_router
-from app.supabase_client import supabase
+from app.routers.answers import router as answers_router
+from app.routers.emotion_stream import router as emotion_stream_router
+from app.routers.emotion_clip import router as emotion_clip_router
+from app.data_access import db
+from app.auth_utils import get_optional_user
+from app.models import checkpoint_sessions, flush_idle_sessions
+from app.config import settings
+from app.utils.interview_session import get_interview_session
+from app.utils.model_registry import registry
 from datetime import datetime
 
 app = FastAPI()
@@ -18,30 +37,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refuse oversized request bodies before multipart parsing spools them
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.MAX_REQUEST_BYTES)
+
+# Outermost, so request latency includes every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(interview_router)
 app.include_router(voice_router)
+app.include_router(answers_router)
+app.include_router(emotion_stream_router)
+app.include_router(emotion_clip_router)
+
+async def _session_sweeper():
+    while True:
+        await asyncio.sleep(settings.SESSION_SWEEP_INTERVAL_SECONDS)
+        try:
+            # Flushes idle sessions and checkpoints the others
+            await flush_idle_sessions()
+        except Exception as e:
+            logging.warning(f"Interview session sweep failed: {e}")
+
+@app.on_event("startup")
+async def startup():
+    await db.open()
+    app.state.session_sweeper = asyncio.create_task(_session_sweeper())
+    # Models load in the background so the process accepts connections right away
+    warmup = settings.MODEL_WARMUP + [name for name in degraded_warmup() if name not in settings.MODEL_WARMUP]
+    app.state.model_warmup = asyncio.create_task(registry.warmup(warmup))
+    app.state.decoder_warmup = asyncio.create_task(run_in_threadpool(warm_decoder_pool))
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.session_sweeper.cancel()
+    app.state.model_warmup.cancel()
+    app.state.decoder_warmup.cancel()
+    await emotion_executor.stop()
+    await asr_executor.stop()
+    shutdown_decoder_pool()
+    # Live sessions are in memory; save them before the process goes away
+    await checkpoint_sessions()
+    await db.close()
 
 @app.get("/")
 async def root():
     return {"message": "Mock Interview Emotion Detection API running."}
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once every model in MODEL_WARMUP is loaded and warmed,
+    503 before that. Always reports per-model state and load/warmup times.
+    """
+    is_ready = registry.ready(settings.MODEL_WARMUP)
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "required": settings.MODEL_WARMUP,
+            "models": registry.status(),
+            "queues": {"emotion": emotion_executor.stats(), "asr": asr_executor.stats()},
+        },
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: stage timings, queue depths, DB and model load times."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/test-db")
 async def test_database():
     """Test database connection and table structure"""
     try:
         # Test users table
-        users_response = supabase.table("users").select("count", count="exact").execute()
+        users_count = await db.count("users")
         
         # Test interviews table
-        interviews_response = supabase.table("interviews").select("count", count="exact").execute()
+        interviews_count = await db.count("interviews")
         
         return {
             "status": "success",
             "database_connected": True,
-            "users_count": users_response.count,
-            "interviews_count": interviews_response.count,
+            "users_count": users_count,
+            "interviews_count": interviews_count,
             "tables": {
                 "users": "exists",
                 "interviews": "exists"
@@ -66,27 +146,50 @@ async def test_insert_interview():
             "timestamp": datetime.now().isoformat()
         }
         
-        print(f"Inserting test data: {test_data}")
-        response = supabase.table("interviews").insert(test_data).execute()
-        print(f"Insert response: {response}")
+        rows = await db.insert("interviews", test_data)
+        log_event("test_insert", sampled=False, rows=len(rows))
         
         return {
             "status": "success",
             "message": "Test interview data inserted",
-            "data": response.data
+            "data": rows
         }
     except Exception as e:
-        print(f"Error inserting test data: {str(e)}")
+        logging.warning(f"Error inserting test data: {str(e)}")
         return {
             "status": "error",
             "error": str(e)
         }
 
 @app.post("/detect_emotion")
-async def detect_emotion(file: UploadFile = File(...)):
+async def detect_emotion(request: Request, file: UploadFile = File(...), interview_id: Optional[str] = None,
+                         current_user: Optional[dict] = Depends(get_optional_user)):
     try:
-        contents = await file.read()
-        emotion = detect_emotion_from_image(contents)
+        with stage("upload"):
+            contents = await read_upload(file, settings.MAX_IMAGE_UPLOAD_BYTES)
+        try:
+            with stage("decode"):
+                img = await run_in_threadpool(decode_image, contents)
+        except ValueError as e:
+            return {"emotion": {"emotion": "error", "confidence": 0.0, "message": str(e)}}
+        # Authenticated callers can attach frames to a live interview session, which
+        # also lets consecutive frames reuse the tracked face box and cached results
+        session = get_interview_session(interview_id, current_user["id"]) if current_user is not None else None
+        stream = session.emotion_stream() if session is not None else None
+        # Frames from concurrent requests are grouped into one batched forward pass;
+        # anonymous callers share fairness by client address
+        key = current_user["id"] if current_user is not None else (request.client.host if request.client else None)
+        try:
+            if stream is not None:
+                emotion = await analyze_frame(img, stream.tracker, stream.frame_cache, key=key)
+            else:
+                emotion = await analyze_frame(img, key=key)
+        except Overloaded as e:
+            raise HTTPException(status_code=e.status, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        if session is not None:
+            session.add_emotion(emotion)
         return {"emotion": emotion}
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
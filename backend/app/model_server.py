@@ -0,0 +1,289 @@
+"""
+Out-of-process model server. One process holds the emotion and ASR models;
+every API worker talks to it instead of loading its own copy.
+
+    python -m app.model_server            # uses MODEL_SERVER_ADDRESS
+
+API workers opt in with EMOTION_BACKEND=remote and/or ASR_BACKEND=remote.
+Each client creates one shared-memory segment and announces it once over a
+multiprocessing.connection control channel (Unix socket or host:port, with
+an auth key). For each call the client writes the frames or PCM clips into
+the segment. Only offsets, shapes and dtypes go over the socket, and the
+server runs inference on numpy views of the segment without copying.
+
+multiprocessing.connection unpickles what it receives, so anyone holding
+the auth key can run code in the server. MODEL_SERVER_AUTHKEY has no
+default, and TCP addresses must be loopback unless MODEL_SERVER_ALLOW_REMOTE
+is set. A server on another host cannot attach the client's segment; the
+client then sends arrays inline over the socket instead.
+"""
+
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.utils.asr import ASREngine, create_asr_engine
+from app.utils.emotion_engine import EmotionEngine, create_emotion_engine
+from app.utils.model_registry import ModelRegistry
+
+_ALIGN = 64
+
+
+def parse_address(address: str):
+    """'host:port' for TCP, anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def check_config(address, authkey: Optional[str]):
+    """Refuse to serve or connect without an auth key, or over non-loopback TCP unless explicitly allowed."""
+    if not authkey:
+        raise RuntimeError("MODEL_SERVER_AUTHKEY must be set to use the model server")
+    if isinstance(address, tuple) and not _is_loopback(address[0]) and not settings.MODEL_SERVER_ALLOW_REMOTE:
+        raise RuntimeError(
+            f"Model server address {address[0]}:{address[1]} is not loopback; "
+            f"set MODEL_SERVER_ALLOW_REMOTE=true to allow it"
+        )
+
+
+def _attach(name: str) -> SharedMemory:
+    """Open a client's segment without letting this process's resource tracker unlink it on exit."""
+    try:
+        return SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def _views(shm: SharedMemory, layout) -> List[np.ndarray]:
+    return [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset) for offset, shape, dtype in layout]
+
+
+class ModelServer:
+    def __init__(self, address: str = settings.MODEL_SERVER_ADDRESS,
+                 authkey: Optional[str] = settings.MODEL_SERVER_AUTHKEY):
+        self.address = parse_address(address)
+        check_config(self.address, authkey)
+        self.authkey = authkey.encode()
+        self.registry = ModelRegistry()
+        self._emotion = self.registry.register(
+            "emotion",
+            lambda: self._loaded(create_emotion_engine(settings.MODEL_SERVER_EMOTION_BACKEND)),
+            lambda engine: engine.analyze(np.zeros((96, 96, 3), dtype=np.uint8)),
+        )
+        self._asr = self.registry.register(
+            "asr",
+            lambda: self._loaded(create_asr_engine(settings.MODEL_SERVER_ASR_BACKEND)),
+            lambda engine: engine.transcribe(np.zeros(8000, dtype=np.int16)),
+        )
+        self._entries = {"emotion": self._emotion, "asr": self._asr}
+        # Engines are not assumed thread-safe; clients are served on separate threads
+        self._locks = {"emotion": threading.Lock(), "asr": threading.Lock()}
+
+    @staticmethod
+    def _loaded(engine):
+        engine.load()
+        return engine
+
+    def _handle(self, conn):
+        shm: Optional[SharedMemory] = None
+        try:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                op = message[0]
+                try:
+                    if op == "attach":
+                        if shm is not None:
+                            shm.close()
+                            shm = None
+                        shm = _attach(message[1])
+                        conn.send(("ok", None))
+                    elif op == "status":
+                        conn.send(("ok", self.registry.status()))
+                    elif op in ("emotion", "asr"):
+                        conn.send(("ok", self._infer(op, shm, message)))
+                    else:
+                        conn.send(("error", f"unknown op {op}"))
+                except Exception as e:
+                    conn.send(("error", str(e)))
+        finally:
+            if shm is not None:
+                shm.close()
+            conn.close()
+
+    def _infer(self, op: str, shm: Optional[SharedMemory], message):
+        _, layout, inline, skip_detection = message
+        # Inline arrays are the fallback for batches that did not fit the segment
+        arrays = inline if inline is not None else _views(shm, layout)
+        try:
+            with self._locks[op]:
+                if op == "emotion":
+                    return self._entries[op].get().analyze_batch(arrays, skip_detection)
+                return self._entries[op].get().transcribe_batch(arrays)
+        finally:
+            # Views pin the segment's buffer; drop them before the client can close it
+            del arrays
+
+    def serve_forever(self, warmup: Optional[List[str]] = None):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        for name in warmup or []:
+            try:
+                self._entries[name].warm()
+            except Exception as e:
+                logging.warning(f"Model server warmup of {name} failed: {e}")
+        with Listener(self.address, authkey=self.authkey) as listener:
+            if isinstance(self.address, str):
+                os.chmod(self.address, 0o600)
+            logging.info(f"Model server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logging.warning(f"Model server rejected a connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), name="model-client", daemon=True).start()
+
+
+class ModelServerClient:
+    """
+    One control connection and one shared-memory segment per client. Calls are
+    synchronous request/reply, made from the batching executor's worker thread.
+    When the server cannot attach the segment (it runs on another host), arrays
+    are sent inline for the life of the connection.
+    """
+
+    def __init__(self, address: str = settings.MODEL_SERVER_ADDRESS,
+                 authkey: Optional[str] = settings.MODEL_SERVER_AUTHKEY,
+                 shm_bytes: int = settings.MODEL_SERVER_SHM_MB * 1024 * 1024):
+        self.address = parse_address(address)
+        check_config(self.address, authkey)
+        self.authkey = authkey.encode()
+        self.shm_bytes = shm_bytes
+        self._shm: Optional[SharedMemory] = None
+        self._shared = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._shm is None:
+            self._shm = SharedMemory(create=True, size=self.shm_bytes)
+            atexit.register(self.close)
+        self._conn = Client(self.address, authkey=self.authkey)
+        self._conn.send(("attach", self._shm.name))
+        status, payload = self._conn.recv()
+        self._shared = status == "ok"
+        if not self._shared:
+            logging.warning(f"Model server cannot attach shared memory, sending arrays inline: {payload}")
+
+    def _reply(self):
+        status, payload = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Model server error: {payload}")
+        return payload
+
+    def _write(self, arrays: List[np.ndarray]) -> Optional[List[Tuple[int, tuple, str]]]:
+        layout, offset = [], 0
+        for arr in arrays:
+            arr = np.ascontiguousarray(arr)
+            if offset + arr.nbytes > self.shm_bytes:
+                return None
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=self._shm.buf, offset=offset)[...] = arr
+            layout.append((offset, arr.shape, arr.dtype.str))
+            offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+        return layout
+
+    def call(self, op: str, arrays: List[np.ndarray] = (), skip_detection: bool = False):
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._conn is None:
+                        self._connect()
+                    if op == "status":
+                        self._conn.send(("status",))
+                        return self._reply()
+                    layout = self._write(list(arrays)) if self._shared else None
+                    inline = None if layout is not None else [np.ascontiguousarray(a) for a in arrays]
+                    self._conn.send((op, layout, inline, skip_detection))
+                    return self._reply()
+                except (EOFError, OSError, ConnectionError) as e:
+                    # The server restarted: reconnect once and resend
+                    self._drop_connection()
+                    if attempt:
+                        raise RuntimeError(f"Model server unavailable: {e}")
+
+    def _drop_connection(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def close(self):
+        with self._lock:
+            self._drop_connection()
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+
+
+class RemoteEmotionEngine(EmotionEngine):
+    name = "remote"
+
+    def __init__(self):
+        self.client = ModelServerClient()
+
+    def load(self):
+        self.client.call("status")
+
+    def analyze_batch(self, images: List[np.ndarray], skip_detection: bool = False) -> List[dict]:
+        return self.client.call("emotion", images, skip_detection)
+
+
+class RemoteASREngine(ASREngine):
+    name = "remote"
+
+    def __init__(self):
+        self.client = ModelServerClient()
+
+    def load(self):
+        self.client.call("status")
+
+    def transcribe_batch(self, clips: List[np.ndarray]) -> List[str]:
+        return self.client.call("asr", clips)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    ModelServer().serve_forever(warmup=settings.MODEL_WARMUP)
+
+
+if __name__ == "__main__":
+    main()
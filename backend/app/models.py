@@ -1,10 +1,22 @@
 # backend/app/models.py
 
+import asyncio
+import base64
+import logging
+import weakref
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
-from app.supabase_client import supabase  # Make sure this file exists
+from app.config import settings
+from app.data_access import db
+from app.utils.metrics import log_event
+from app.utils.interview_session import (
+    InterviewSession, get_interview_session, idle_sessions, live_sessions, pop_session, resume_session,
+)
+from app.utils.fillers import tokenize
+from app.utils.timeseries import ConfidenceSeries
+from app.utils import answer_index, user_stats
 
 # Confidence data point model
 class ConfidenceDataPoint(BaseModel):
@@ -45,39 +57,445 @@ class InterviewData(BaseModel):
         
         return total_weighted_confidence / total_duration
 
+    def confidence_series(self) -> dict:
+        """Encoded fixed-period series of the confidence data points."""
+        series = ConfidenceSeries(settings.CONFIDENCE_SERIES_PERIOD_SECONDS)
+        series.extend(
+            [max(0.0, min(100.0, p.confidence)) for p in self.confidence_data],
+            [p.duration for p in self.confidence_data],
+        )
+        return series.encode()
+
 # Function to save interview data
-def save_interview_data(data: InterviewData):
+async def save_interview_data(data: InterviewData, overall_confidence: Optional[float] = None):
     try:
-        # Calculate overall confidence
-        overall_confidence = data.calculate_overall_confidence()
+        # Calculate overall confidence (callers that already have it pass it in)
+        if overall_confidence is None:
+            overall_confidence = data.calculate_overall_confidence()
 
-        # Prepare data for database (exclude confidence_data, add calculated confidence)
+        # Prepare data for database (confidence_data is stored as a compact series, plus the calculated confidence)
         db_data = {
             "user_id": str(data.user_id),  # store as UUID string
             "job_role": data.job_role,
             "interview_name": data.interview_name,
             "level": data.level,
             "confidence": overall_confidence,  # Store calculated overall confidence
+            "confidence_series": data.confidence_series(),  # Compact series for charts
             "answers": data.answers,
             "timestamp": data.timestamp.isoformat() if isinstance(data.timestamp, datetime) else data.timestamp,
         }
 
-        print(f"Saving interview data to database: {db_data}")
-        response = supabase.table("interviews").insert(db_data).execute()
-        print(f"Database response: {response}")
-        return response
+        rows = await db.insert("interviews", db_data)
+        log_event(
+            "interview_saved",
+            user_id=db_data["user_id"],
+            interview_id=rows[0].get("id") if rows else None,
+            answers=len(data.answers or []),
+            confidence_points=len(data.confidence_data or []),
+        )
+        await update_user_stats(data.user_id, new_row=rows[0] if rows else db_data)
+        await update_answer_index(data.user_id, new_row=rows[0] if rows else None)
+        return rows
     except Exception as e:
-        print(f"Error saving interview data: {str(e)}")
+        logging.error(f"Error saving interview data: {str(e)}")
         raise e
 
-# Function to retrieve interviews for a user
-def get_user_interviews(user_id: UUID | str):
+# Columns a client may ask for when listing interviews
+INTERVIEW_COLUMNS = {
+    "id", "user_id", "job_role", "interview_name", "level", "confidence", "timestamp",
+    "answers", "answer", "filler_words", "confidence_stats", "confidence_series",
+}
+# Small columns that are enough to render an interview list
+SUMMARY_COLUMNS = ["id", "job_role", "interview_name", "level", "confidence", "timestamp", "filler_words"]
+
+def encode_cursor(row: dict) -> str:
+    raw = f"{row['timestamp']}|{row['id']}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str):
+    """
+    (timestamp, id) of a cursor, normalized. Both are parsed, so nothing but an
+    ISO timestamp and a UUID can reach the PostgREST filter built from them.
+    """
+    try:
+        timestamp, interview_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(timestamp).isoformat(), str(UUID(interview_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+# Function to retrieve one page of a user's interviews, newest first
+async def get_user_interviews(user_id: UUID | str, limit: int = 50, cursor: Optional[str] = None,
+                              columns: Optional[List[str]] = None):
+    """
+    Keyset pagination over (timestamp, id): each page continues strictly after
+    the last row of the previous one, so deep pages cost the same as the first.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    columns = list(columns or ["*"])
+    if columns != ["*"]:
+        # The cursor is built from these, so they are always selected
+        for required in ("id", "timestamp"):
+            if required not in columns:
+                columns.append(required)
+    params = []
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        params.append(("or", f'(timestamp.lt."{timestamp}",and(timestamp.eq."{timestamp}",id.lt."{last_id}"))'))
+    rows = await db.select(
+        "interviews",
+        columns=",".join(columns),
+        filters={"user_id": str(user_id)},
+        order="timestamp.desc,id.desc",
+        limit=limit + 1,
+        params=params,
+    )
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+# Function to retrieve a single interview of a user, all columns
+async def get_user_interview(user_id: UUID | str, interview_id: str, columns: Optional[List[str]] = None):
+    rows = await db.select("interviews", columns=",".join(columns or ["*"]),
+                           filters={"id": interview_id, "user_id": str(user_id)}, limit=1)
+    return rows[0] if rows else None
+
+# Function to update some fields of a user's interview; returns None if it is not theirs
+async def update_interview_fields(user_id: UUID | str, interview_id: str, fields: dict):
+    old_row = await get_user_interview(user_id, interview_id, columns=user_stats.ROLLUP_COLUMNS)
+    if old_row is None:
+        return None
+    rows = await db.update("interviews", fields, filters={"id": interview_id, "user_id": str(user_id)})
+    new_row = rows[0] if rows else {**old_row, **fields}
+    await update_user_stats(user_id, old_row, new_row)
+    await update_answer_index(user_id, old_row, new_row)
+    return rows
+
+# Function to retrieve the stored confidence series blob for one of a user's interviews
+async def get_confidence_series(user_id: UUID | str, interview_id: str):
+    rows = await db.select("interviews", columns="id,confidence_series",
+                           filters={"id": interview_id, "user_id": str(user_id)}, limit=1)
+    if not rows:
+        return None
+    return rows[0].get("confidence_series")
+
+# Per-user locks so concurrent writes for one user apply their rollup deltas in turn
+# within this process; across processes the revision check below serializes them
+_stats_locks = weakref.WeakValueDictionary()
+
+# Attempts at a conditional rollup update before giving up and dropping the rollup
+STATS_UPDATE_ATTEMPTS = 5
+
+def _stats_lock(user_id: str) -> asyncio.Lock:
+    lock = _stats_locks.get(user_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _stats_locks[user_id] = lock
+    return lock
+
+async def _load_user_stats_row(uid: str) -> Optional[dict]:
+    rows = await db.select("user_stats", columns="stats,revision", filters={"user_id": uid}, limit=1)
+    return rows[0] if rows else None
+
+def _current_stats(row: Optional[dict]) -> Optional[dict]:
+    stats = (row or {}).get("stats")
+    if stats and stats.get("version") == user_stats.STATS_VERSION:
+        return stats
+    return None
+
+async def _load_user_stats(uid: str) -> Optional[dict]:
+    return _current_stats(await _load_user_stats_row(uid))
+
+async def _rebuild_user_stats(uid: str) -> dict:
+    """Recompute a user's rollup from all of their interviews (first use, or after a format change)."""
+    stats = user_stats.empty_stats()
+    cursor = None
+    while True:
+        rows, cursor = await get_user_interviews(uid, limit=200, cursor=cursor, columns=user_stats.ROLLUP_COLUMNS)
+        for row in rows:
+            user_stats.apply(stats, user_stats.contribution(row))
+        if cursor is None:
+            return stats
+
+async def _store_user_stats(uid: str, stats: dict, revision: int):
+    await db.upsert("user_stats", {"user_id": uid, "stats": stats, "revision": revision,
+                                   "updated_at": datetime.utcnow().isoformat()}, on_conflict="user_id")
+
+# Function to fold one interview write into the user's rollup (call after the write)
+async def update_user_stats(user_id: UUID | str, old_row: Optional[dict] = None, new_row: Optional[dict] = None):
+    """
+    Read-modify-write of the rollup as a compare-and-swap on `revision`: the
+    update only applies if no other worker stored the rollup since it was
+    read, otherwise it is re-read and the delta applied again.
+    """
+    uid = str(user_id)
     try:
-        uid = str(user_id)
-        print(f"Fetching interviews for user_id: {uid}")
-        response = supabase.table("interviews").select("*").eq("user_id", uid).execute()
-        print(f"Retrieved interviews: {response.data}")
-        return response.data
+        async with _stats_lock(uid):
+            for _ in range(STATS_UPDATE_ATTEMPTS):
+                row = await _load_user_stats_row(uid)
+                stats = _current_stats(row)
+                revision = int((row or {}).get("revision") or 0)
+                if stats is None:
+                    # The rebuild reads the interviews table, which already has this write
+                    await _store_user_stats(uid, await _rebuild_user_stats(uid), revision + 1)
+                    return
+                user_stats.apply(stats, user_stats.contribution(old_row), -1)
+                user_stats.apply(stats, user_stats.contribution(new_row), 1)
+                stored = await db.update(
+                    "user_stats",
+                    {"stats": stats, "revision": revision + 1, "updated_at": datetime.utcnow().isoformat()},
+                    filters={"user_id": uid, "revision": revision},
+                )
+                if stored:
+                    return
+            raise RuntimeError(f"rollup kept changing under {STATS_UPDATE_ATTEMPTS} attempts")
     except Exception as e:
-        print(f"Error retrieving interviews: {str(e)}")
-        raise e
+        # Never fail the interview write for the rollup; drop it so the next read rebuilds it
+        logging.warning(f"Error updating user stats: {str(e)}")
+        try:
+            await db.delete("user_stats", filters={"user_id": uid})
+        except Exception:
+            pass
+
+# Function to retrieve a user's rollup, building it on first use
+async def get_user_stats(user_id: UUID | str) -> dict:
+    uid = str(user_id)
+    stats = await _load_user_stats(uid)
+    if stats is None:
+        async with _stats_lock(uid):
+            row = await _load_user_stats_row(uid)
+            stats = _current_stats(row)
+            if stats is None:
+                stats = await _rebuild_user_stats(uid)
+                await _store_user_stats(uid, stats, int((row or {}).get("revision") or 0) + 1)
+    return user_stats.summarize(stats)
+
+# Per-user inverted index over answer and transcript text: answer_terms holds
+# the postings, answer_index marks users whose postings are complete
+async def _answer_index_ready(uid: str) -> bool:
+    rows = await db.select("answer_index", columns="version", filters={"user_id": uid}, limit=1)
+    return bool(rows) and rows[0].get("version") == answer_index.INDEX_VERSION
+
+async def _rebuild_answer_index(uid: str):
+    """Recreate a user's postings from all of their interviews (first search, or after a format change)."""
+    await db.delete("answer_terms", filters={"user_id": uid})
+    cursor = None
+    while True:
+        rows, cursor = await get_user_interviews(uid, limit=200, cursor=cursor, columns=answer_index.INDEX_COLUMNS)
+        postings = [p for row in rows for p in answer_index.postings(uid, row)]
+        if postings:
+            await db.insert("answer_terms", postings)
+        if cursor is None:
+            break
+    await db.upsert("answer_index", {"user_id": uid, "version": answer_index.INDEX_VERSION,
+                                     "built_at": datetime.utcnow().isoformat()}, on_conflict="user_id")
+
+async def _ensure_answer_index(uid: str):
+    if not await _answer_index_ready(uid):
+        async with _stats_lock(uid):
+            if not await _answer_index_ready(uid):
+                await _rebuild_answer_index(uid)
+
+# Function to replace one interview's postings after a write (call after the write)
+async def update_answer_index(user_id: UUID | str, old_row: Optional[dict] = None, new_row: Optional[dict] = None):
+    uid = str(user_id)
+    interview_id = (new_row or old_row or {}).get("id")
+    if not interview_id or answer_index.unchanged(old_row, new_row):
+        return
+    try:
+        # Same per-user lock as the rollup, so a rebuild never interleaves with a write
+        async with _stats_lock(uid):
+            if old_row is not None:
+                await db.delete("answer_terms", filters={"interview_id": str(interview_id)})
+            postings = answer_index.postings(uid, new_row)
+            if postings:
+                await db.insert("answer_terms", postings)
+    except Exception as e:
+        # Never fail the interview write for the index; mark it stale so the next search rebuilds it
+        logging.warning(f"Error updating answer index: {str(e)}")
+        try:
+            await db.delete("answer_index", filters={"user_id": uid})
+        except Exception:
+            pass
+
+# Candidate interview ids per request when fetching postings for a narrowed set
+POSTINGS_ID_CHUNK = 100
+
+async def _word_postings(uid: str, words: List[str], interview_ids: Optional[List[str]] = None):
+    """
+    Word postings, newest first. Unrestricted reads stop at
+    ANSWER_SEARCH_MAX_POSTINGS; returns (rows, truncated).
+    """
+    filters = {"user_id": uid, "kind": answer_index.WORD, "term": ("in", sorted(set(words)))}
+    columns = "interview_id,field,term,positions,timestamp"
+    if interview_ids is None:
+        rows = await db.select("answer_terms", columns=columns, filters=filters, order="timestamp.desc",
+                               limit=settings.ANSWER_SEARCH_MAX_POSTINGS + 1)
+        return rows[:settings.ANSWER_SEARCH_MAX_POSTINGS], len(rows) > settings.ANSWER_SEARCH_MAX_POSTINGS
+    rows = []
+    for start in range(0, len(interview_ids), POSTINGS_ID_CHUNK):
+        chunk = interview_ids[start:start + POSTINGS_ID_CHUNK]
+        rows.extend(await db.select("answer_terms", columns=columns,
+                                    filters={**filters, "interview_id": ("in", chunk)}))
+    return rows, False
+
+async def _all_words_postings(uid: str, words: List[str]):
+    """
+    Postings for documents that may contain every one of `words`. The rarest
+    word is read first and the others only within its interviews, so the cap
+    applies to the smallest side of the intersection; returns (rows, truncated).
+    """
+    words = sorted(set(words))
+    if len(words) == 1:
+        return await _word_postings(uid, words)
+    counts = await asyncio.gather(*(
+        db.count("answer_terms", filters={"user_id": uid, "kind": answer_index.WORD, "term": word}) for word in words
+    ))
+    if min(counts) == 0:
+        return [], False
+    rarest = words[counts.index(min(counts))]
+    rows, truncated = await _word_postings(uid, [rarest])
+    candidates = sorted({str(row["interview_id"]) for row in rows})
+    others, _ = await _word_postings(uid, [w for w in words if w != rarest], interview_ids=candidates)
+    return rows + others, truncated
+
+# Function to search a user's answers and transcripts; reads only the postings of the query's words
+async def search_answers(user_id: UUID | str, query: str, limit: int = 20):
+    """
+    Returns (results, truncated). `truncated` is set when the rarest query
+    word has more than ANSWER_SEARCH_MAX_POSTINGS postings, so older matches
+    may be missing.
+    """
+    uid = str(user_id)
+    clauses = answer_index.parse_query(query)
+    if not clauses:
+        return [], False
+    await _ensure_answer_index(uid)
+    rows, truncated = await _all_words_postings(uid, [w for words in clauses for w in words])
+    hits = answer_index.match(answer_index.group_postings(rows), clauses)[:limit]
+    if not hits:
+        return [], truncated
+    interviews = await db.select(
+        "interviews",
+        columns="id,job_role,interview_name,answers,answer",
+        filters={"user_id": uid, "id": ("in", sorted({h["interview_id"] for h in hits}))},
+    )
+    by_id = {str(row["id"]): row for row in interviews}
+    results = []
+    for hit in hits:
+        row = by_id.get(str(hit["interview_id"]))
+        if row is None:
+            continue
+        position, span = hit.pop("first")
+        results.append({
+            **hit,
+            "job_role": row.get("job_role"),
+            "interview_name": row.get("interview_name"),
+            "snippet": answer_index.snippet(answer_index.field_text(row, hit["field"]), position, span),
+        })
+    return results, truncated
+
+# Function to count words or phrases in a user's answers per day/week/month
+async def get_term_frequency(user_id: UUID | str, terms: List[str], bucket: str = "week"):
+    """Returns (series, truncated); see search_answers for `truncated`."""
+    uid = str(user_id)
+    parsed = [[t for t, _, _ in tokenize(term)] for term in terms]
+    parsed = [words for words in parsed if words]
+    if not parsed:
+        return [], False
+    await _ensure_answer_index(uid)
+    rows, truncated = [], False
+    # Each term is counted on its own, so a phrase only intersects its own words
+    for words in parsed:
+        term_rows, term_truncated = await _all_words_postings(uid, words)
+        rows.extend(term_rows)
+        truncated = truncated or term_truncated
+    return answer_index.frequency(answer_index.group_postings(rows), parsed, bucket), truncated
+
+# Function to rank fillers across all of a user's interviews
+async def get_top_fillers(user_id: UUID | str, limit: int = 10) -> List[dict]:
+    uid = str(user_id)
+    await _ensure_answer_index(uid)
+    rows = await db.select("answer_terms", columns="interview_id,term,count,timestamp",
+                           filters={"user_id": uid, "kind": answer_index.FILLER})
+    return answer_index.top_fillers(rows, limit)
+
+# Columns a live session is resumed from
+SESSION_COLUMNS = [
+    "id", "user_id", "job_role", "level", "answer", "filler_words", "confidence_stats", "confidence_series",
+]
+
+# Function to write a live session's record to its interview row, with the rollup and index
+async def _write_session_record(session: InterviewSession):
+    version = session.version
+    record = session.record()
+    old_row = await get_user_interview(session.user_id, session.interview_id, columns=user_stats.ROLLUP_COLUMNS)
+    rows = await db.update("interviews", record, filters={"id": session.interview_id})
+    session.saved_version = version
+    if old_row is not None:
+        new_row = rows[0] if rows else {**old_row, **record}
+        await update_user_stats(session.user_id, old_row, new_row)
+        await update_answer_index(session.user_id, old_row, new_row)
+    return rows
+
+# Writes of a finishing session's record while results keep arriving during the write
+SESSION_FINAL_WRITES = 3
+
+# Function to write a live interview session's final record (once)
+async def save_session_record(session: InterviewSession):
+    """
+    The session keeps accepting results while its record is written. Results
+    that arrived during the write are written again (up to
+    SESSION_FINAL_WRITES times), and only then is it closed, so nothing is
+    dropped unless results keep streaming in throughout.
+    """
+    async with session.write_lock:
+        if session.flushed:
+            return []
+        try:
+            for _ in range(SESSION_FINAL_WRITES):
+                rows = await _write_session_record(session)
+                if session.version == session.saved_version:
+                    break
+            session.flushed = True
+            pop_session(session)
+            log_event(
+                "interview_session_flushed",
+                user_id=session.user_id,
+                interview_id=session.interview_id,
+                fields=sorted(session.record()),
+            )
+            return rows
+        except Exception as e:
+            logging.error(f"Error flushing interview session: {str(e)}")
+            raise e
+
+# Function to save a live session's progress so far, if it changed since the last save
+async def checkpoint_session(session: InterviewSession):
+    async with session.write_lock:
+        if session.flushed or session.version == session.saved_version:
+            return
+        await _write_session_record(session)
+
+# Function to checkpoint every live session (periodically, and on shutdown)
+async def checkpoint_sessions():
+    for session in live_sessions():
+        try:
+            await checkpoint_session(session)
+        except Exception as e:
+            logging.warning(f"Error checkpointing interview session: {str(e)}")
+
+# Function to flush sessions whose browser went away without finishing, and checkpoint the rest
+async def flush_idle_sessions():
+    for session in idle_sessions(settings.SESSION_IDLE_TIMEOUT_SECONDS):
+        try:
+            await save_session_record(session)
+        except Exception:
+            pass
+    await checkpoint_sessions()
+
+# Function to get the live session of one of a user's interviews, resuming it from its row if needed
+async def open_interview_session(user_id: UUID | str, interview_id: str) -> Optional[InterviewSession]:
+    session = get_interview_session(interview_id, user_id)
+    if session is not None:
+        return session
+    row = await get_user_interview(user_id, interview_id, columns=SESSION_COLUMNS)
+    return resume_session(row) if row is not None else None
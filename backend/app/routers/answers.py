@@ -1,29 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.auth_utils import get_current_user
-from app.supabase_client import supabase
+from app.data_access import db
+from app.models import get_term_frequency, get_top_fillers, search_answers
 
 
 router = APIRouter(prefix="/answers", tags=["answers"])
 
 
 @router.get("/")
-def list_answers(current_user: dict = Depends(get_current_user)):
+async def list_answers(current_user: dict = Depends(get_current_user)):
     try:
-        data = supabase.table("answers").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).execute()
-        return {"status": "success", "answers": data.data}
+        rows = await db.select("answers", filters={"user_id": current_user["id"]}, order="created_at.desc")
+        return {"status": "success", "answers": rows}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{answer_id}/filler_words")
-def get_filler_words(answer_id: str, current_user: dict = Depends(get_current_user)):
+async def get_filler_words(answer_id: str, current_user: dict = Depends(get_current_user)):
     try:
         # optional join-like behavior if separate table exists
-        data = supabase.table("filler_words").select("*").eq("answer_id", answer_id).execute()
-        return {"status": "success", "filler_words": data.data}
+        rows = await db.select("filler_words", filters={"answer_id": answer_id})
+        return {"status": "success", "filler_words": rows}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/search")
+async def search(q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=100),
+                 current_user: dict = Depends(get_current_user)):
+    """
+    Keyword and phrase search over the user's answers and transcripts:
+    `q=teamwork "you know"` finds answers containing every word and every
+    quoted phrase. Served from the inverted index, so the cost follows the
+    number of postings for the query's words, not the size of the history.
+    `truncated` is true when the rarest word has more postings than are read
+    per search, so older matches may be missing.
+    """
+    try:
+        results, truncated = await search_answers(current_user["id"], q, limit)
+        return {"status": "success", "query": q, "results": results, "truncated": truncated}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Answer search failed: {str(e)}")
+
+
+@router.get("/terms")
+async def term_frequency(terms: str = Query(..., min_length=1), bucket: str = Query("week", pattern="^(day|week|month)$"),
+                         current_user: dict = Depends(get_current_user)):
+    """Occurrences of comma-separated words or phrases (`terms=um,you know`) per day, week or month."""
+    names = [t.strip() for t in terms.split(",") if t.strip()]
+    try:
+        series, truncated = await get_term_frequency(current_user["id"], names, bucket)
+        return {"status": "success", "bucket": bucket, "terms": names, "series": series, "truncated": truncated}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute term frequency: {str(e)}")
 
 
+@router.get("/fillers/top")
+async def top_fillers(limit: int = Query(10, ge=1, le=50), current_user: dict = Depends(get_current_user)):
+    """The user's most frequent fillers across all sessions, with how many interviews use each."""
+    try:
+        return {"status": "success", "fillers": await get_top_fillers(current_user["id"], limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve top fillers: {str(e)}")
@@ -1,48 +1,52 @@
 # app/routers/auth.py
 
+import logging
 from fastapi import APIRouter, HTTPException, Depends
-from supabase import create_client, Client
-import os
-from app.schemas import SignupRequest, LoginRequest  # <-- include LoginRequest
-from app.supabase_client import supabase
-from app.auth_utils import get_current_user
+from app.schemas import SignupRequest, LoginRequest, ProfileUpdateRequest
+from app.data_access import db
+from app.auth_utils import get_current_user, create_access_token, invalidate_user, SECRET_KEY
+from app.utils.metrics import log_event
 
 router = APIRouter(prefix="/auth", tags=["auth"])  # <--- IMPORTANT
 
-# Supabase setup
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+def _issue_token(user_data: dict) -> str:
+    # Signed JWTs are verified without a database lookup (the profile is read
+    # through the user cache); fall back to the demo token when unconfigured
+    if not SECRET_KEY:
+        return f"token_{user_data['id']}"  # Simple token for demo
+    return create_access_token({
+        "sub": str(user_data["id"]),
+        "email": user_data["email"],
+        "name": user_data.get("username", "User"),
+    })
 
 @router.post("/signup")
-def signup(user: SignupRequest):
+async def signup(user: SignupRequest):
     try:
-        print("Signing up user:", user.dict())
-        response = supabase.table("users").insert({
+        rows = await db.insert("users", {
             "email": user.email,
             "password": user.password,
             "username": user.name  # Store name in username column
-        }).execute()
-        print("Signup response:", response)
+        })
+        log_event("signup", user_id=rows[0].get("id") if rows else None)
 
         return {"message": "User registered successfully"}
     except Exception as e:
-        print("Exception in signup:", str(e))
+        logging.warning(f"Exception in signup: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/login")
-def login(user: LoginRequest):
+async def login(user: LoginRequest):
     try:
-        print("Logging in user:", user.dict())
-        response = supabase.table("users").select("*").eq("email", user.email).eq("password", user.password).execute()
-        print("Login response:", response)
+        rows = await db.select("users", filters={"email": user.email, "password": user.password})
+        log_event("login", success=bool(rows), user_id=rows[0].get("id") if rows else None)
 
-        # response is a list of records
-        if not response.data:
+        # rows is a list of records
+        if not rows:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
-        user_data = response.data[0]
+        user_data = rows[0]
         return {
             "message": "Login successful", 
             "user": {
@@ -50,10 +54,10 @@ def login(user: LoginRequest):
                 "name": user_data.get("username", "User"),  # Use username as name
                 "email": user_data["email"]
             },
-            "access_token": f"token_{user_data['id']}"  # Simple token for demo
+            "access_token": _issue_token(user_data)
         }
     except Exception as e:
-        print("Exception in login:", str(e))
+        logging.warning(f"Exception in login: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/user")
@@ -65,5 +69,26 @@ def get_user_profile(current_user: dict = Depends(get_current_user)):
             "email": current_user["email"]
         }
     except Exception as e:
-        print("Exception in get_user_profile:", str(e))
+        logging.warning(f"Exception in get_user_profile: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.patch("/user")
+async def update_user_profile(update: ProfileUpdateRequest, current_user: dict = Depends(get_current_user)):
+    try:
+        rows = await db.update("users", {"username": update.name}, filters={"id": current_user["id"]})
+        invalidate_user(current_user["id"])
+        if not rows:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_data = rows[0]
+        return {
+            "id": user_data["id"],
+            "name": user_data.get("username", "User"),
+            "email": user_data["email"],
+            # Claims in the old JWT are now stale, so hand out a fresh one
+            "access_token": _issue_token(user_data)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.warning(f"Exception in update_user_profile: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
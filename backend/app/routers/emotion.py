@@ -1,26 +1,33 @@
 # app/routers/emotion.py
 
-from fastapi import APIRouter, UploadFile, File
-from fer import FER
-import numpy as np
-import cv2
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.utils.emotion_detector import analyze_frame
+from app.utils.image import decode_image
+from app.utils.inference import Overloaded
+from app.utils.uploads import read_upload
 
 router = APIRouter()
-emotion_detector = FER(mtcnn=True)
+
 
 @router.post("/detect_emotion/")
 async def detect_emotion(file: UploadFile = File(...)):
-    contents = await file.read()
-    np_array = np.frombuffer(contents, np.uint8)
-    frame = cv2.imdecode(np_array, cv2.IMREAD_COLOR)
+    contents = await read_upload(file, settings.MAX_IMAGE_UPLOAD_BYTES)
+    try:
+        frame = await run_in_threadpool(decode_image, contents)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    result = emotion_detector.detect_emotions(frame)
+    # Same engine (EMOTION_BACKEND) and batching executor as /detect_emotion
+    try:
+        result = await analyze_frame(frame)
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-    if result:
-        emotions = result[0]["emotions"]
-        top_emotion = max(emotions, key=emotions.get)
+    if result.get("emotion") != "error" and result.get("box") != [0, 0, frame.shape[1], frame.shape[0]]:
         return {
-            "emotion": top_emotion,
-            "confidence": emotions[top_emotion]
+            "emotion": result["emotion"],
+            "confidence": result["confidence"]
         }
     return {"emotion": "No face detected", "confidence": 0.0}
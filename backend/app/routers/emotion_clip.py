@@ -0,0 +1,127 @@
+# app/routers/emotion_clip.py
+
+from typing import Dict, List, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from starlette.concurrency import run_in_threadpool
+from app.auth_utils import get_current_user
+from app.config import settings
+from app.utils.emotion_detector import analyze_frames
+from app.utils.image import decode_image
+from app.utils.inference import Overloaded
+from app.utils.interview_session import get_interview_session
+from app.utils.metrics import stage
+from app.utils.uploads import read_upload
+from app.utils.video import decode_clip, sample_indices
+
+router = APIRouter(tags=["emotion"])
+
+
+def _decode_frames(blobs: List[bytearray], indices: List[int]) -> List:
+    images = []
+    for i in indices:
+        try:
+            images.append(decode_image(blobs[i]))
+        except ValueError as e:
+            raise ValueError(f"Frame {i}: {e}")
+    return images
+
+
+def _durations(times: List[float], step: float) -> List[float]:
+    """Each frame stands for the time until the next one; the last for one sampling step."""
+    return [max(later - t, 1e-3) for t, later in zip(times, times[1:])] + ([step] if times else [])
+
+
+def summarize_timeline(timeline: List[dict], step: float) -> dict:
+    """
+    Aggregates over a scored timeline, weighted by how long each frame stands
+    for, so uneven gaps in a burst are handled. Frames that failed are left out.
+    """
+    dwell: Dict[str, float] = {}
+    weighted, total, errors = 0.0, 0.0, 0
+    durations = _durations([point["t"] for point in timeline], step)
+    for point, duration in zip(timeline, durations):
+        if point["emotion"] == "error":
+            errors += 1
+            continue
+        dwell[point["emotion"]] = dwell.get(point["emotion"], 0.0) + duration
+        weighted += point["confidence"] * duration
+        total += duration
+    return {
+        "dominant_emotion": max(dwell, key=dwell.get) if dwell else None,
+        "weighted_confidence": round(weighted / total, 3) if total else 0.0,
+        "emotion_share": {emotion: round(seconds / total, 3) for emotion, seconds in sorted(dwell.items())} if total else {},
+        "scored_seconds": round(total, 3),
+        "errors": errors,
+    }
+
+
+@router.post("/detect_emotion/clip")
+async def detect_emotion_clip(
+    frames: Optional[List[UploadFile]] = File(None),
+    clip: Optional[UploadFile] = File(None),
+    fps: float = Query(settings.CLIP_DEFAULT_FPS, gt=0, le=settings.CLIP_MAX_FPS),
+    capture_fps: Optional[float] = Query(None, gt=0),
+    interview_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Score many frames in one request: either a multipart burst of JPEG
+    `frames` (in capture order, taken at `capture_fps`, default `fps`) or one
+    short video `clip` (webm/mp4). Frames are sampled at `fps`, scored as
+    batches and returned as a timeline with aggregates:
+
+        {"frames_received": 40, "frames_scored": 20, "inferences": 12, "duration": 9.5,
+         "timeline": [{"t": 0.0, "emotion": "neutral", "confidence": 0.81, "box": [...]}, ...],
+         "summary": {"dominant_emotion": "neutral", "weighted_confidence": 0.78, ...}}
+
+    With `interview_id` of a live interview, the scored frames also feed its
+    confidence and emotion totals. `frames_received` is null for clips.
+    """
+    frames = frames or []
+    if bool(frames) == (clip is not None):
+        raise HTTPException(status_code=400, detail="Send either 'frames' or one 'clip'")
+    if len(frames) > settings.CLIP_MAX_FRAMES:
+        raise HTTPException(status_code=413, detail=f"At most {settings.CLIP_MAX_FRAMES} frames per request")
+    try:
+        if clip is not None:
+            with stage("upload"):
+                data = await read_upload(clip, settings.MAX_CLIP_UPLOAD_BYTES)
+            with stage("decode_clip"):
+                decoded = await run_in_threadpool(decode_clip, data, fps)
+            received = None
+            times = [t for t, _ in decoded]
+            images = [img for _, img in decoded]
+        else:
+            with stage("upload"):
+                blobs = [await read_upload(f, settings.MAX_IMAGE_UPLOAD_BYTES) for f in frames]
+            received = len(blobs)
+            # Sample before decoding so skipped frames cost nothing
+            keep = sample_indices([i / (capture_fps or fps) for i in range(len(blobs))], fps)
+            times = [round(i / (capture_fps or fps), 3) for i in keep]
+            with stage("decode"):
+                images = await run_in_threadpool(_decode_frames, blobs, keep)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        results = await analyze_frames(images, key=current_user["id"])
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    timeline = [{"t": t, **result} for t, result in zip(times, results)]
+    summary = summarize_timeline(timeline, 1.0 / fps)
+
+    session = get_interview_session(interview_id, current_user["id"])
+    if session is not None:
+        for point, duration in zip(timeline, _durations(times, 1.0 / fps)):
+            session.add_emotion(point, duration=duration)
+
+    return {
+        "frames_received": received,
+        "frames_scored": len(images),
+        "inferences": sum(1 for result in results if not result.get("cached")),
+        "fps": fps,
+        "duration": round(times[-1] + 1.0 / fps, 3) if times else 0.0,
+        "timeline": timeline,
+        "summary": summary,
+    }
@@ -0,0 +1,126 @@
+# app/routers/emotion_stream.py
+
+import asyncio
+import logging
+import time
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.auth_utils import resolve_user
+from app.config import settings
+from app.models import open_interview_session
+from app.utils.emotion_detector import analyze_frame
+from app.utils.interview_session import InterviewSession, get_interview_session
+from app.utils.image import decode_image
+from app.utils.inference import Overloaded
+from app.utils.metrics import stage
+
+router = APIRouter(tags=["emotion"])
+
+# Close code for a socket opened on an interview the user does not own
+WS_FORBIDDEN = 4403
+
+
+async def _open_session(interview_id: str, user_id: str) -> Optional[InterviewSession]:
+    try:
+        return await open_interview_session(user_id, interview_id)
+    except Exception as e:
+        logging.warning(f"Opening the session of interview {interview_id} failed: {e}")
+        return None
+
+
+@router.websocket("/ws/emotion/{interview_id}")
+async def emotion_stream(websocket: WebSocket, interview_id: str):
+    """
+    Stream webcam frames for one interview over a single connection.
+
+    Authenticate with `?token=<access token>` (browsers cannot set headers on a
+    WebSocket), then send each JPEG frame as a binary message. The server replies
+    with one JSON message per processed frame:
+
+        {"type": "emotion", "seq": 12, "emotion": {...}, "session": {...}, "latency_ms": 41.2}
+
+    If frames arrive faster than they can be analyzed, only the newest pending
+    frame is kept so results never lag behind the live video. A frame refused
+    or dropped by admission control is answered with
+    {"type": "overloaded", "seq": 12, "retry_after": 1} and not counted.
+
+    The interview must belong to the authenticated user, otherwise the socket
+    is closed with code 4403. Without a live session in this process (e.g.
+    after a restart) the session is resumed from the interview row.
+    """
+    token = websocket.query_params.get("token")
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Missing token")
+        user = await resolve_user(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    live = await _open_session(interview_id, str(user["id"]))
+    if live is None:
+        await websocket.close(code=WS_FORBIDDEN)
+        return
+    session = live.emotion_stream()
+    pending = {"frame": None}
+    frame_ready = asyncio.Event()
+
+    async def process_frames():
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            seq, data, received_at = pending["frame"]
+            pending["frame"] = None
+            try:
+                with stage("decode"):
+                    img = await run_in_threadpool(decode_image, data)
+                result = await analyze_frame(img, session.tracker, session.frame_cache, key=session.user_id)
+            except Overloaded as e:
+                session.frames_dropped += 1
+                await websocket.send_json({"type": "overloaded", "seq": seq, "retry_after": e.retry_after})
+                continue
+            except ValueError as e:
+                result = {"emotion": "error", "confidence": 0.0, "message": str(e)}
+            session.update(result)
+            live = get_interview_session(interview_id, session.user_id)
+            if live is not None:
+                live.add_emotion(result)
+            await websocket.send_json({
+                "type": "emotion",
+                "seq": seq,
+                "emotion": result,
+                "session": session.snapshot(),
+                "latency_ms": round((time.monotonic() - received_at) * 1000, 1),
+            })
+
+    worker = asyncio.create_task(process_frames())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data and len(data) > settings.MAX_IMAGE_UPLOAD_BYTES:
+                session.frames_dropped += 1
+                await websocket.send_json({"type": "error", "message": f"Frame exceeds the {settings.MAX_IMAGE_UPLOAD_BYTES} byte limit"})
+            elif data:
+                if pending["frame"] is not None:
+                    session.frames_dropped += 1
+                pending["frame"] = (session.next_seq(), data, time.monotonic())
+                frame_ready.set()
+            elif message.get("text") == "ping":
+                await websocket.send_json({"type": "pong", "session": session.snapshot()})
+            if worker.done():
+                break
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logging.warning(f"Emotion stream for interview {interview_id} failed: {e}")
+    finally:
+        worker.cancel()
+        try:
+            await worker
+        except (asyncio.CancelledError, Exception):
+            pass
@@ -1,9 +1,16 @@
 # backend/app/routers/interview.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from app.models import InterviewData, save_interview_data, get_user_interviews
-from app.supabase_client import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.models import (
+    INTERVIEW_COLUMNS, SUMMARY_COLUMNS, InterviewData, get_confidence_series, get_user_interview,
+    get_user_interviews, get_user_stats, save_interview_data, save_session_record, update_interview_fields,
+    update_user_stats,
+)
+from app.data_access import db
 from app.auth_utils import get_current_user
+from app.utils.interview_session import start_session, get_interview_session
+from app.utils.timeseries import decode_series, downsample
 from uuid import uuid4
 from datetime import datetime
 
@@ -30,36 +37,72 @@ async def save_interview(interview: InterviewData, current_user: dict = Depends(
         # Set user_id from authenticated user (UUID)
         interview.user_id = current_user["id"]
         
-        # Calculate and save interview data
-        response = save_interview_data(interview)
+        # Calculate once and save interview data
+        overall_confidence = interview.calculate_overall_confidence()
+        rows = await save_interview_data(interview, overall_confidence)
         
         return {
             "status": "success", 
             "message": "Interview data saved successfully",
-            "overall_confidence": interview.calculate_overall_confidence(),
-            "data": response.data
+            "overall_confidence": overall_confidence,
+            "data": rows
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save interview data: {str(e)}")
 
 @router.get("/")
-async def get_interviews(current_user: dict = Depends(get_current_user)):
+async def get_interviews(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    current_user: dict = Depends(get_current_user),
+):
     """
-    Retrieve all interviews for the authenticated user.
+    List the authenticated user's interviews, newest first, one page at a time.
+    Pass the returned `next_cursor` to get the following page. `view=summary`
+    returns only the columns needed for a list; `fields` picks columns explicitly.
+    Use GET /interview/{id} for a full row.
     """
+    if fields:
+        columns = [c.strip() for c in fields.split(",") if c.strip()]
+        unknown = sorted(set(columns) - INTERVIEW_COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    elif view == "summary":
+        columns = SUMMARY_COLUMNS
+    else:
+        columns = None
     try:
-        data = get_user_interviews(current_user["id"])
+        data, next_cursor = await get_user_interviews(current_user["id"], limit=limit, cursor=cursor, columns=columns)
         return {
             "status": "success", 
-            "interviews": data
+            "interviews": data,
+            "next_cursor": next_cursor,
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve interviews: {str(e)}")
 
+@router.get("/stats")
+async def get_interview_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Precomputed progress rollups for the authenticated user: counts, weighted
+    confidence means overall, by job role and by level, filler totals by word,
+    and weekly buckets. Maintained as interviews are written, so this is one
+    row read regardless of how many interviews the user has.
+    """
+    try:
+        return {"status": "success", "stats": await get_user_stats(current_user["id"])}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve interview stats: {str(e)}")
+
 @router.post("/start")
 async def start_interview(payload: dict, current_user: dict = Depends(get_current_user)):
     """
     Create and return a new interview row. Request body should include job_role, interview_name, level, pre-fill as needed.
+    Also opens the server-side session that emotion and transcription results for this interview feed into.
     """
     try:
         now = datetime.now().isoformat()
@@ -71,14 +114,86 @@ async def start_interview(payload: dict, current_user: dict = Depends(get_curren
             "level": (payload or {}).get("level"),
             "timestamp": now,
         }
-        response = supabase.table("interviews").insert(record).execute()
-        if not response.data:
+        rows = await db.insert("interviews", record)
+        if not rows:
             raise HTTPException(status_code=500, detail="Insert returned no data from Supabase")
-        new_row = response.data[0]
+        new_row = rows[0]
+        if new_row.get("id") is not None:
+            start_session(new_row["id"], record["user_id"], job_role=record["job_role"], level=record["level"])
+        await update_user_stats(record["user_id"], new_row=new_row)
         return {"status": "success", "id": new_row.get("id"), "row": new_row}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start interview: {str(e)}")
 
+@router.get("/{interview_id}/session")
+async def get_interview_session_stats(interview_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Live running statistics for an interview that is still in progress.
+    """
+    session = get_interview_session(interview_id, current_user["id"])
+    if session is None:
+        raise HTTPException(status_code=404, detail="No active session for this interview")
+    return {"status": "success", "stats": session.stats()}
+
+@router.get("/{interview_id}/confidence")
+async def get_confidence_timeline(
+    interview_id: str,
+    resolution: Optional[float] = Query(None, gt=0, description="Window size in seconds"),
+    points: Optional[int] = Query(None, gt=0, le=10000, description="Maximum number of windows"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Confidence over time as min/max/mean windows, for charting. Pass either
+    `resolution` (seconds per window) or `points` (max windows); defaults to 200 points.
+    """
+    try:
+        blob = await get_confidence_series(current_user["id"], interview_id)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Interview not found or has no confidence series")
+        values = decode_series(blob)
+        if resolution is None and points is None:
+            points = 200
+        return {
+            "status": "success",
+            "period": blob["period"],
+            "samples": int(values.size),
+            "timeline": downsample(values, blob["period"], resolution=resolution, points=points),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load confidence series: {str(e)}")
+
+@router.post("/{interview_id}/finish")
+async def finish_interview(interview_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Close the server-side session and write its final record (confidence, statistics,
+    transcript and filler words) to the interview row. Results that arrive while
+    the record is being written are included. Sessions the client never
+    finishes are flushed automatically once idle.
+    """
+    session = get_interview_session(interview_id, current_user["id"])
+    if session is None:
+        raise HTTPException(status_code=404, detail="No active session for this interview")
+    try:
+        rows = await save_session_record(session)
+        return {"status": "success", "stats": session.stats(), "data": rows}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to finish interview: {str(e)}")
+
+@router.get("/{interview_id}")
+async def get_interview(interview_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Retrieve one interview with all of its columns.
+    """
+    try:
+        row = await get_user_interview(current_user["id"], interview_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve interview: {str(e)}")
+    if row is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return {"status": "success", "interview": row}
+
 @router.patch("/{interview_id}")
 async def update_interview(interview_id: str, payload: dict, current_user: dict = Depends(get_current_user)):
     """
@@ -91,7 +206,11 @@ async def update_interview(interview_id: str, payload: dict, current_user: dict
                 update_fields[k] = payload[k]
         if not update_fields:
             raise HTTPException(status_code=400, detail="No updatable fields provided.")
-        resp = supabase.table("interviews").update(update_fields).eq("id", interview_id).execute()
-        return {"status": "success", "data": resp.data}
+        rows = await update_interview_fields(current_user["id"], interview_id, update_fields)
+        if rows is None:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        return {"status": "success", "data": rows}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update interview: {str(e)}")
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import Tuple
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Tuple
+import asyncio
 import tempfile
 import os
 import logging
 import subprocess
-from app.supabase_client import supabase
-from app.auth_utils import get_current_user
+import numpy as np
+from app.auth_utils import get_current_user, resolve_user
+from app.config import settings
+from app.utils.audio import SAMPLE_RATE, StreamingDecoder
+from app.utils.decoder_pool import decode_audio
+from app.utils.asr import UNINTELLIGIBLE, asr_degraded, transcribe_pcm
+from app.utils.inference import Overloaded
+from app.utils.interview_session import get_interview_session
+from app.utils.streaming_asr import StreamingRecognizer
+from app.utils.vad import detect_speech, trim_silence
+from app.utils.fillers import get_lexicon
+from app.utils.metrics import stage
+from app.utils.model_registry import registry
+from app.utils.uploads import read_upload
 import speech_recognition as sr
 
 try:
@@ -25,7 +39,6 @@ router = APIRouter(tags=["voice"])
 
 
 _classifier = None
-_asr_model = None
 
 
 def _load_classifier():
@@ -36,21 +49,9 @@ def ensure_model_ready() -> bool:
     return True
 
 
-def _load_asr_model():
-    global _asr_model
-    if _asr_model is not None:
-        return _asr_model
-    try:
-        from faster_whisper import WhisperModel
-    except Exception as e:
-        raise RuntimeError("faster-whisper not installed. Please add 'faster-whisper' to requirements.txt")
-    _asr_model = WhisperModel("base", device="cpu", compute_type="float32")
-    return _asr_model
-
-
 def ensure_asr_ready() -> bool:
     try:
-        _ = _load_asr_model()
+        registry.get("asr")
         return True
     except Exception as e:
         logging.warning(f"ASR model warmup failed: {e}")
@@ -115,38 +116,92 @@ async def detect_voice_emotion(file: UploadFile = File(...)):
     raise HTTPException(status_code=410, detail="Voice emotion endpoint removed. Use /transcribe_voice/ instead.")
 
 
+def _read_audio_via_temp_files(data: bytes, suffix: str) -> np.ndarray:
+    """
+    Legacy decode path: write the upload to disk, convert it to wav and read it
+    back. Only used when AUDIO_DECODE_MODE=tempfile or in-memory decoding fails.
+    """
+    src_path = None
+    wav_path, created_wav = None, False
+    try:
+        src_path = _write_temp_file(data, suffix)
+        with stage("convert"):
+            wav_path, created_wav = _ensure_wav(src_path)
+        with sr.AudioFile(wav_path) as source:
+            audio_data = sr.Recognizer().record(source)
+        raw = audio_data.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        return np.frombuffer(raw, dtype=np.int16)
+    finally:
+        try:
+            if src_path and os.path.exists(src_path):
+                os.remove(src_path)
+        except Exception:
+            pass
+        try:
+            if created_wav and os.path.exists(wav_path):
+                os.remove(wav_path)
+        except Exception:
+            pass
+
+
+def _read_audio(data: bytes, suffix: str) -> np.ndarray:
+    with stage("decode"):
+        return _decode_audio(data, suffix)
+
+
+def _decode_audio(data: bytes, suffix: str) -> np.ndarray:
+    if settings.AUDIO_DECODE_MODE != "tempfile":
+        try:
+            return decode_audio(data, SAMPLE_RATE)
+        except Exception as e:
+            logging.warning(f"In-memory audio decode failed, falling back to temp files: {e}")
+    return _read_audio_via_temp_files(data, suffix)
+
+
 @router.post("/transcribe_voice/")
-async def transcribe_voice(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+async def transcribe_voice(file: UploadFile = File(...), interview_id: Optional[str] = None,
+                           current_user: dict = Depends(get_current_user)):
     try:
-        data = await file.read()
+        with stage("upload"):
+            data = await read_upload(file, settings.MAX_AUDIO_UPLOAD_BYTES)
         if not data:
             raise HTTPException(status_code=400, detail="Empty audio payload")
 
         original_suffix = ".wav" if file.filename and file.filename.lower().endswith(".wav") else ".webm"
-        src_path = _write_temp_file(data, original_suffix)
-        wav_path, created_wav = _ensure_wav(src_path)
+        pcm = await run_in_threadpool(_read_audio, data, original_suffix)
 
-        r = sr.Recognizer()
-        with sr.AudioFile(wav_path) as source:
-            audio_data = r.record(source)
-            try:
-                transcript_text = r.recognize_sphinx(audio_data)  # Offline Sphinx
-            except sr.UnknownValueError:
-                transcript_text = "(Could not understand audio)"
-            except sr.RequestError as e:
-                transcript_text = f"(Sphinx error: {e})"
-
-        # Compute filler words
-        filler_list = [
-            "um", "uh", "like", "you know", "so", "actually", "basically", "literally",
-            "right", "okay", "well", "hmm", "erm", "ah", "eh"
-        ]
-        text_lower = transcript_text.lower()
-        filler_counts = {}
-        for fw in filler_list:
-            count = text_lower.count(fw)
-            if count > 0:
-                filler_counts[fw] = count
+        vad = None
+        if settings.VAD_ENABLED:
+            with stage("vad"):
+                vad = detect_speech(pcm, SAMPLE_RATE)
+            if not vad["speech"]:
+                # Silence or room noise: skip recognition entirely
+                return {
+                    "status": "success",
+                    "transcript": {"text": "", "filler_words": {}, "filler_occurrences": [], "vad": vad,
+                                   "degraded": False},
+                }
+            pcm = trim_silence(pcm, vad, SAMPLE_RATE)
+            vad["trimmed_duration"] = round(pcm.size / SAMPLE_RATE, 3)
+
+        # Recognition runs on the shared ASR executor (backend chosen by ASR_BACKEND);
+        # under load it is bounded per user and may fall back to a smaller model
+        degraded = asr_degraded()
+        try:
+            # Queue wait plus recognition; the executor reports the two separately
+            with stage("transcribe"):
+                transcript_text = await transcribe_pcm(pcm, key=current_user["id"], degraded=degraded)
+        except Overloaded as e:
+            raise HTTPException(status_code=e.status, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+        # Compute filler words (whole-word, single pass, tenant-specific lexicon)
+        with stage("fillers"):
+            fillers = get_lexicon(current_user.get("tenant_id")).analyze(transcript_text)
+        filler_counts = fillers["counts"]
+
+        session = get_interview_session(interview_id, current_user["id"])
+        if session is not None and transcript_text != UNINTELLIGIBLE:
+            session.add_transcript(transcript_text, filler_counts)
 
         # interview_record = {
         #     "user_id": current_user["id"],
@@ -154,7 +209,7 @@ async def transcribe_voice(file: UploadFile = File(...), current_user: dict = De
         #     "filler_words": filler_counts,
         # }
         # try:
-        #     supabase.table("interviews").insert(interview_record).execute()
+        #     await db.insert("interviews", interview_record)
         # except Exception as db_err:
         #     logging.warning(f"Supabase insert failed for interviews (answer/filler_words): {db_err}")
 
@@ -163,21 +218,123 @@ async def transcribe_voice(file: UploadFile = File(...), current_user: dict = De
             "transcript": {
                 "text": transcript_text,
                 "filler_words": filler_counts,
+                "filler_occurrences": fillers["occurrences"],
+                "vad": vad,
+                "degraded": degraded,
             }
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Voice transcription failed: {str(e)}")
-    finally:
-        try:
-            if 'src_path' in locals() and os.path.exists(src_path):
-                os.remove(src_path)
-        except Exception:
-            pass
+
+
+@router.websocket("/ws/transcribe/{interview_id}")
+async def transcribe_stream(websocket: WebSocket, interview_id: str):
+    """
+    Incremental speech-to-text over one connection.
+
+    Query params: `token` (access token) and `format`, either `webm` (default;
+    Opus in webm/ogg as produced by MediaRecorder with a timeslice) or `pcm`
+    (raw 16 kHz mono s16le). Send audio as binary messages and the text
+    message `end` to flush. The server pushes partial and final segments:
+
+        {"type": "partial", "text": "tell me about", "start": 0.42, "end": 1.9}
+        {"type": "final", "text": "tell me about yourself", "start": 0.42, "end": 2.6,
+         "words": [...], "filler_words": {}, "filler_occurrences": []}
+
+    If decoding or recognition fails, the server sends {"type": "error",
+    "detail": ...} and closes the socket with 1011.
+    """
+    token = websocket.query_params.get("token")
+    audio_format = websocket.query_params.get("format", "webm").lower()
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Missing token")
+        user = await resolve_user(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    lexicon = get_lexicon(user.get("tenant_id"))
+    try:
+        recognizer = await run_in_threadpool(StreamingRecognizer)
+    except Exception as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    async def emit(events):
+        for event in events:
+            if event["type"] == "final":
+                word_times = [(w["start"], w["end"]) for w in event.get("words", [])]
+                fillers = lexicon.analyze(event["text"], word_times=word_times or None)
+                event["filler_words"] = fillers["counts"]
+                event["filler_occurrences"] = fillers["occurrences"]
+                live = get_interview_session(interview_id, user["id"])
+                if live is not None:
+                    live.add_transcript(event["text"], fillers["counts"])
+            await websocket.send_json(event)
+
+    async def recognize(pcm: bytes):
+        await emit(await run_in_threadpool(recognizer.accept, pcm))
+
+    async def fail(e: BaseException):
+        logging.warning(f"Transcription stream for interview {interview_id} failed: {e}")
         try:
-            if 'created_wav' in locals() and created_wav and os.path.exists(wav_path):
-                os.remove(wav_path)
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
         except Exception:
             pass
 
+    # Reader failures are reported as soon as they happen, from its done callback
+    failures = []
+    decoder = None
+    reader = None
+    if audio_format != "pcm":
+        decoder = StreamingDecoder(sample_rate=recognizer.sample_rate)
+        await decoder.start()
+
+        async def read_pcm():
+            async for pcm in decoder.pcm_chunks():
+                await recognize(pcm)
+
+        def reader_done(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                failures.append(asyncio.create_task(fail(task.exception())))
+
+        reader = asyncio.create_task(read_pcm())
+        reader.add_done_callback(reader_done)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect" or failures:
+                break
+            data = message.get("bytes")
+            if data:
+                if decoder is not None:
+                    await decoder.feed(data)
+                else:
+                    await recognize(data)
+            elif message.get("text") == "end":
+                if decoder is not None:
+                    await decoder.finish()
+                    await reader
+                await emit(await run_in_threadpool(recognizer.flush))
+                await websocket.send_json({"type": "end", "duration": round(recognizer.position, 2)})
+                break
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        # A reader failure re-raised by `await reader` was already reported
+        if not failures:
+            await fail(e)
+    finally:
+        if reader is not None and not reader.done():
+            reader.cancel()
+        if failures:
+            await asyncio.gather(*failures, return_exceptions=True)
+        if decoder is not None:
+            await decoder.close()
@@ -9,6 +9,9 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+class ProfileUpdateRequest(BaseModel):
+    name: str
+
 class InterviewResultCreate(BaseModel):
     username: str
     confidence_score: float
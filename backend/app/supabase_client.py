@@ -1,13 +0,0 @@
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import os
-
-load_dotenv()  # This will look for .env in root of backend/
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL or SUPABASE_KEY is missing!")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
@@ -0,0 +1,194 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.utils.fillers import get_lexicon, tokenize
+
+INDEX_VERSION = 1
+
+# Interview columns postings are built from
+INDEX_COLUMNS = ["id", "timestamp", "answers", "answer"]
+
+WORD = "word"
+FILLER = "filler"
+
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def documents(row: Optional[dict]) -> List[Tuple[str, str]]:
+    """The indexed texts of one interview row as (field, text): each typed answer and the live transcript."""
+    if not row:
+        return []
+    docs = []
+    answers = row.get("answers")
+    if isinstance(answers, list):
+        for i, text in enumerate(answers):
+            if isinstance(text, str) and text.strip():
+                docs.append((f"answers.{i}", text))
+    if isinstance(row.get("answer"), str) and row["answer"].strip():
+        docs.append(("answer", row["answer"]))
+    return docs
+
+
+def field_text(row: dict, field: str) -> str:
+    if field == "answer":
+        return row.get("answer") or ""
+    _, _, index = field.partition(".")
+    answers = row.get("answers") or []
+    return answers[int(index)] if index.isdigit() and int(index) < len(answers) else ""
+
+
+def postings(user_id: str, row: Optional[dict]) -> List[dict]:
+    """
+    Posting rows for one interview: one per (field, word) with the word's
+    token positions, and one per (field, filler) with the positions where the
+    filler starts. Fillers use the default lexicon, so the index is the same
+    for every tenant.
+    """
+    if not row or not row.get("id"):
+        return []
+    lexicon = get_lexicon(None)
+    rows = []
+    for field, text in documents(row):
+        tokens = tokenize(text)
+        words: Dict[str, List[int]] = {}
+        for position, (word, _, _) in enumerate(tokens):
+            words.setdefault(word, []).append(position)
+        fillers: Dict[str, List[int]] = {}
+        for occurrence in lexicon.analyze(text)["occurrences"]:
+            fillers.setdefault(occurrence["filler"], []).append(occurrence["token"])
+        for kind, terms in ((WORD, words), (FILLER, fillers)):
+            for term, positions in terms.items():
+                rows.append({
+                    "user_id": str(user_id),
+                    "interview_id": str(row["id"]),
+                    "kind": kind,
+                    "term": term,
+                    "field": field,
+                    "positions": positions,
+                    "count": len(positions),
+                    "timestamp": row.get("timestamp"),
+                })
+    return rows
+
+
+def unchanged(old_row: Optional[dict], new_row: Optional[dict]) -> bool:
+    """True when a write left everything the index is built from as it was."""
+    if old_row is None or new_row is None:
+        return False
+    return documents(old_row) == documents(new_row) and str(old_row.get("timestamp")) == str(new_row.get("timestamp"))
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """
+    Split a search into clauses, each a list of words: "quoted text" is one
+    phrase clause and any other word is a clause of its own. All clauses must
+    match.
+    """
+    clauses = []
+    for phrase, word in _QUERY_RE.findall(query or ""):
+        words = [t for t, _, _ in tokenize(phrase or word)]
+        if not words:
+            continue
+        if phrase:
+            clauses.append(words)
+        else:
+            clauses.extend([w] for w in words)
+    return clauses
+
+
+def _phrase_starts(positions: Dict[str, set], words: List[str]) -> List[int]:
+    """Token positions where `words` occur consecutively."""
+    first = positions.get(words[0], set())
+    return sorted(p for p in first if all(p + k in positions.get(w, ()) for k, w in enumerate(words[1:], 1)))
+
+
+def group_postings(rows: List[dict]) -> Dict[Tuple[str, str], dict]:
+    """Word postings grouped per document (interview, field): {"timestamp", "positions": {term: set}}."""
+    docs: Dict[Tuple[str, str], dict] = {}
+    for row in rows:
+        doc = docs.setdefault((row["interview_id"], row["field"]), {"timestamp": row.get("timestamp"), "positions": {}})
+        doc["positions"][row["term"]] = set(row.get("positions") or [])
+    return docs
+
+
+def match(docs: Dict[Tuple[str, str], dict], clauses: List[List[str]]) -> List[dict]:
+    """
+    Documents where every clause occurs, best first: more matches, then
+    newer. `first` is the (token position, length in tokens) of the earliest
+    match, for the snippet.
+    """
+    hits = []
+    for (interview_id, field), doc in docs.items():
+        spans = []
+        for words in clauses:
+            found = _phrase_starts(doc["positions"], words)
+            if not found:
+                break
+            spans.extend((position, len(words)) for position in found)
+        else:
+            hits.append({"interview_id": interview_id, "field": field, "timestamp": doc["timestamp"],
+                         "matches": len(spans), "first": min(spans)})
+    hits.sort(key=lambda h: str(h["timestamp"] or ""), reverse=True)
+    hits.sort(key=lambda h: h["matches"], reverse=True)
+    return hits
+
+
+def snippet(text: str, position: int, span: int = 1, context: int = 60) -> str:
+    """A short excerpt of `text` around the token at `position`, with the match marked by [ ]."""
+    tokens = tokenize(text)
+    if not tokens or position >= len(tokens):
+        return text[:2 * context]
+    start = tokens[position][1]
+    end = tokens[min(position + span, len(tokens)) - 1][2]
+    left, right = max(0, start - context), min(len(text), end + context)
+    return (
+        ("…" if left > 0 else "") + text[left:start] + "[" + text[start:end] + "]" + text[end:right]
+        + ("…" if right < len(text) else "")
+    )
+
+
+def bucket_key(timestamp, bucket: str) -> Optional[str]:
+    if not timestamp:
+        return None
+    try:
+        when = timestamp if isinstance(timestamp, datetime) else datetime.fromisoformat(str(timestamp))
+    except ValueError:
+        return None
+    if bucket == "day":
+        return when.date().isoformat()
+    if bucket == "month":
+        return f"{when.year}-{when.month:02d}"
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def frequency(docs: Dict[Tuple[str, str], dict], terms: List[List[str]], bucket: str) -> List[dict]:
+    """Occurrences of each term (a word or phrase) per time bucket, oldest first."""
+    buckets: Dict[str, dict] = {}
+    for doc in docs.values():
+        key = bucket_key(doc["timestamp"], bucket)
+        if key is None:
+            continue
+        for words in terms:
+            found = len(_phrase_starts(doc["positions"], words))
+            if found:
+                counts = buckets.setdefault(key, {})
+                term = " ".join(words)
+                counts[term] = counts.get(term, 0) + found
+    return [{"bucket": key, "counts": counts} for key, counts in sorted(buckets.items())]
+
+
+def top_fillers(rows: List[dict], limit: int) -> List[dict]:
+    """Filler postings totalled per filler, most frequent first."""
+    totals: Dict[str, dict] = {}
+    for row in rows:
+        entry = totals.setdefault(row["term"], {"filler": row["term"], "count": 0, "interviews": set(),
+                                                "first_seen": None, "last_seen": None})
+        entry["count"] += int(row.get("count") or 0)
+        entry["interviews"].add(row["interview_id"])
+        seen = row.get("timestamp")
+        if seen:
+            entry["first_seen"] = min(filter(None, [entry["first_seen"], seen]))
+            entry["last_seen"] = max(filter(None, [entry["last_seen"], seen]))
+    ranked = sorted(totals.values(), key=lambda e: (-e["count"], e["filler"]))[:limit]
+    return [{**entry, "interviews": len(entry["interviews"])} for entry in ranked]
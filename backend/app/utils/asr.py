@@ -0,0 +1,254 @@
+import abc
+import logging
+import threading
+from typing import Hashable, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.utils.audio import SAMPLE_RATE
+from app.utils.inference import BatchingExecutor
+from app.utils.metrics import stage
+from app.utils.model_registry import registry
+
+UNINTELLIGIBLE = "(Could not understand audio)"
+
+
+class ASREngine(abc.ABC):
+    """
+    Speech-to-text backend. Engines take 16 kHz mono int16 PCM clips and
+    return one transcript per clip.
+    """
+
+    name = "base"
+
+    def load(self):
+        """Load model weights ahead of the first request (optional)."""
+
+    @abc.abstractmethod
+    def transcribe_batch(self, clips: List[np.ndarray]) -> List[str]:
+        """One transcript per clip, in order."""
+
+    def transcribe(self, pcm: np.ndarray) -> str:
+        return self.transcribe_batch([pcm])[0]
+
+
+class SphinxEngine(ASREngine):
+    """Offline PocketSphinx via SpeechRecognition. Has no batch mode, so clips run back to back."""
+
+    name = "sphinx"
+
+    def transcribe_batch(self, clips: List[np.ndarray]) -> List[str]:
+        import speech_recognition as sr
+        r = sr.Recognizer()
+        texts = []
+        for pcm in clips:
+            audio_data = sr.AudioData(pcm.tobytes(), SAMPLE_RATE, 2)
+            try:
+                texts.append(r.recognize_sphinx(audio_data))
+            except sr.UnknownValueError:
+                texts.append(UNINTELLIGIBLE)
+            except sr.RequestError as e:
+                texts.append(f"(Sphinx error: {e})")
+        return texts
+
+
+class WhisperEngine(ASREngine):
+    """
+    faster-whisper (CTranslate2) on CPU with a configurable model size and
+    quantization (int8 / int8_float16 / float32). Clips that arrive together
+    are encoded and decoded as one batch; anything the batch path cannot
+    handle (clips over 30 s, older faster-whisper) is transcribed one by one.
+    """
+
+    name = "whisper"
+    MAX_BATCH_SECONDS = 30
+
+    def __init__(self, model_size: str = "base", compute_type: str = "int8", cpu_threads: int = 0,
+                 beam_size: int = 1, language: Optional[str] = "en"):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        self.language = language
+        self._model = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except Exception:
+                    raise RuntimeError("faster-whisper not installed. Please add 'faster-whisper' to requirements.txt")
+                self._model = WhisperModel(
+                    self.model_size,
+                    device="cpu",
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                )
+        return self._model
+
+    @staticmethod
+    def _to_float(pcm: np.ndarray) -> np.ndarray:
+        return pcm.astype(np.float32) / 32768.0
+
+    def _transcribe_one(self, pcm: np.ndarray) -> str:
+        segments, _ = self.load().transcribe(
+            self._to_float(pcm),
+            beam_size=self.beam_size,
+            language=self.language,
+            condition_on_previous_text=False,
+        )
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        return text or UNINTELLIGIBLE
+
+    def _generate_batch(self, clips: List[np.ndarray]) -> List[str]:
+        import ctranslate2
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+
+        model = self.load()
+        if self._tokenizer is None:
+            self._tokenizer = Tokenizer(
+                model.hf_tokenizer,
+                model.model.is_multilingual,
+                task="transcribe",
+                language=self.language or "en",
+            )
+        tokenizer = self._tokenizer
+        features = np.stack([
+            pad_or_trim(model.feature_extractor(self._to_float(pcm)))
+            for pcm in clips
+        ]).astype(np.float32)
+        prompt = list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+        results = model.model.generate(
+            ctranslate2.StorageView.from_array(np.ascontiguousarray(features)),
+            [prompt] * len(clips),
+            beam_size=self.beam_size,
+            max_length=448,
+            suppress_blank=True,
+        )
+        return [tokenizer.decode(result.sequences_ids[0]).strip() or UNINTELLIGIBLE for result in results]
+
+    def transcribe_batch(self, clips: List[np.ndarray]) -> List[str]:
+        if len(clips) > 1 and all(pcm.size <= self.MAX_BATCH_SECONDS * SAMPLE_RATE for pcm in clips):
+            try:
+                return self._generate_batch(clips)
+            except Exception as e:
+                logging.warning(f"Batched whisper decode failed, transcribing clips individually: {e}")
+        return [self._transcribe_one(pcm) for pcm in clips]
+
+
+_engine: Optional[ASREngine] = None
+_engine_lock = threading.Lock()
+
+
+def create_asr_engine(backend: str) -> ASREngine:
+    backend = (backend or "sphinx").lower()
+    if backend == "sphinx":
+        return SphinxEngine()
+    if backend == "whisper":
+        return WhisperEngine(
+            model_size=settings.WHISPER_MODEL_SIZE,
+            compute_type=settings.WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.WHISPER_CPU_THREADS,
+            beam_size=settings.WHISPER_BEAM_SIZE,
+        )
+    if backend == "remote":
+        # Models live in the shared model server (python -m app.model_server)
+        from app.model_server import RemoteASREngine
+        return RemoteASREngine()
+    raise ValueError(f"Unknown ASR backend: {backend}")
+
+
+def get_asr_engine() -> ASREngine:
+    """The process-wide engine selected by ASR_BACKEND."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_asr_engine(settings.ASR_BACKEND)
+    return _engine
+
+
+def _load_asr_engine() -> ASREngine:
+    engine = get_asr_engine()
+    engine.load()
+    return engine
+
+
+def _warmup_asr_engine(engine: ASREngine):
+    engine.transcribe(np.zeros(SAMPLE_RATE // 2, dtype=np.int16))
+
+
+registry.register("asr", _load_asr_engine, _warmup_asr_engine)
+
+
+def _has_degraded_engine() -> bool:
+    return (settings.ASR_BACKEND or "").lower() == "whisper" and bool(settings.WHISPER_DEGRADED_MODEL_SIZE)
+
+
+def _load_degraded_asr_engine() -> ASREngine:
+    """The smaller Whisper model that takes over while the ASR queue is degraded."""
+    if not _has_degraded_engine():
+        raise RuntimeError("No degraded ASR model: requires ASR_BACKEND=whisper and WHISPER_DEGRADED_MODEL_SIZE")
+    engine = WhisperEngine(
+        model_size=settings.WHISPER_DEGRADED_MODEL_SIZE,
+        compute_type=settings.WHISPER_COMPUTE_TYPE,
+        cpu_threads=settings.WHISPER_CPU_THREADS,
+        beam_size=1,
+    )
+    engine.load()
+    return engine
+
+
+# Warmed at startup after the required models (see degraded_warmup); degraded mode
+# stays off until then, so a spike never waits for this model to load
+_degraded_entry = registry.register("asr_degraded", _load_degraded_asr_engine, _warmup_asr_engine)
+
+
+def degraded_warmup() -> List[str]:
+    """Optional models to warm after MODEL_WARMUP; they do not gate /ready."""
+    return ["asr_degraded"] if _has_degraded_engine() else []
+
+
+def _transcribe_batch(items: List[Tuple[np.ndarray, bool]]) -> List[str]:
+    """Executor batch: clips queued in degraded mode go to the smaller model."""
+    results: List[Optional[str]] = [None] * len(items)
+    for degraded, name in ((False, "asr"), (True, "asr_degraded")):
+        indices = [i for i, (_, flag) in enumerate(items) if flag == degraded]
+        if indices:
+            with stage(name):
+                texts = registry.get(name).transcribe_batch([items[i][0] for i in indices])
+            for i, text in zip(indices, texts):
+                results[i] = text
+    return results
+
+
+asr_executor = BatchingExecutor(
+    _transcribe_batch,
+    max_batch_size=settings.ASR_MAX_BATCH_SIZE,
+    window_ms=settings.ASR_BATCH_WINDOW_MS,
+    name="asr",
+    max_queue=settings.ASR_MAX_QUEUE,
+    max_per_key=settings.ASR_MAX_PER_USER,
+    deadline_ms=settings.ASR_DEADLINE_MS,
+)
+
+
+def asr_degraded() -> bool:
+    """True while the ASR queue is loaded enough to switch to the smaller, already warm, model."""
+    return (_has_degraded_engine() and _degraded_entry.warmed and asr_executor.max_queue > 0
+            and asr_executor.load() >= settings.INFERENCE_DEGRADE_LOAD)
+
+
+async def transcribe_pcm(pcm: np.ndarray, key: Optional[Hashable] = None, degraded: bool = False) -> str:
+    """
+    Queue a decoded clip on the shared ASR executor and wait for its
+    transcript. `degraded` routes it to the smaller model; `key` (the caller's
+    user id) is used for per-user fairness. Raises `Overloaded` when admission
+    control refuses or drops the clip.
+    """
+    return await asr_executor.submit((pcm, degraded), key)
@@ -0,0 +1,164 @@
+import asyncio
+import io
+import shutil
+import subprocess
+import wave
+from typing import AsyncIterator, Optional
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def ffmpeg_binary() -> str:
+    """
+    Path to an ffmpeg executable: the imageio-ffmpeg bundled binary when
+    available, otherwise whatever is on PATH.
+    """
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def _resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    if src_rate == dst_rate or samples.size == 0:
+        return samples
+    n_out = int(round(samples.size * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(samples.size), samples.astype(np.float32))
+
+
+def _decode_wav(data: bytes, sample_rate: int) -> np.ndarray:
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+    if width == 2:
+        samples = np.frombuffer(frames, dtype="<i2")
+    elif width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif width == 4:
+        samples = (np.frombuffer(frames, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if channels == 1 and rate == sample_rate and samples.dtype == np.int16:
+        return samples
+    samples = _resample(samples, rate, sample_rate)
+    return np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+
+
+def _decode_with_ffmpeg(data: bytes, sample_rate: int) -> np.ndarray:
+    proc = subprocess.run(
+        [
+            ffmpeg_binary(),
+            "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "s16le",
+            "-acodec", "pcm_s16le",
+            "-ar", str(sample_rate),
+            "-ac", "1",
+            "pipe:1",
+        ],
+        input=data,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise RuntimeError(f"ffmpeg decode failed: {proc.stderr.decode(errors='ignore').strip()[:200]}")
+    return np.frombuffer(proc.stdout, dtype=np.int16)
+
+
+def _decode_with_av(data: bytes, sample_rate: int) -> np.ndarray:
+    # PyAV links libavcodec in-process, so decoding needs no ffmpeg spawn
+    import av
+    chunks = []
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):
+            chunks.append(out.to_ndarray().reshape(-1))
+    if not chunks:
+        raise RuntimeError("No audio frames decoded")
+    return np.concatenate(chunks).astype(np.int16, copy=False)
+
+
+def is_wav(data: bytes) -> bool:
+    return data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def decode_to_pcm(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode uploaded audio bytes (wav/webm/ogg/mp3) entirely in memory into a
+    mono int16 PCM buffer at `sample_rate`. WAV is parsed directly; other
+    containers are piped through ffmpeg's stdin/stdout with no files on disk.
+    """
+    if not data:
+        raise ValueError("Empty audio payload")
+    if is_wav(data):
+        return _decode_wav(data, sample_rate)
+    return _decode_with_ffmpeg(data, sample_rate)
+
+
+class StreamingDecoder:
+    """
+    A single long-running ffmpeg process that turns a continuous container
+    stream (webm/ogg Opus from MediaRecorder) into 16 kHz mono s16le PCM.
+
+    Chunks are written with `feed()` as they arrive and decoded PCM is read
+    back through `pcm_chunks()`. The process lives for the whole connection,
+    so there is no per-chunk spawn and no container re-parsing.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._proc: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self):
+        self._proc = await asyncio.create_subprocess_exec(
+            ffmpeg_binary(),
+            "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "s16le",
+            "-acodec", "pcm_s16le",
+            "-ar", str(self.sample_rate),
+            "-ac", "1",
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def feed(self, data: bytes):
+        self._proc.stdin.write(data)
+        await self._proc.stdin.drain()
+
+    async def finish(self):
+        """Signal end of input; remaining PCM can still be read afterwards."""
+        if self._proc and self._proc.stdin and not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+
+    async def pcm_chunks(self, chunk_size: int = 8192) -> AsyncIterator[bytes]:
+        while True:
+            data = await self._proc.stdout.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+    async def close(self):
+        if self._proc is None:
+            return
+        await self.finish()
+        if self._proc.returncode is None:
+            try:
+                await asyncio.wait_for(self._proc.wait(), timeout=2)
+            except asyncio.TimeoutError:
+                self._proc.kill()
+                await self._proc.wait()
@@ -0,0 +1,241 @@
+import importlib.util
+import logging
+import multiprocessing
+import queue
+import threading
+from typing import List, Optional
+import numpy as np
+from app.config import settings
+from app.utils.audio import SAMPLE_RATE, _decode_with_av, decode_to_pcm, is_wav
+
+
+def _worker_main(conn, sample_rate: int):
+    """
+    Decoder worker loop. Runs in a long-lived child process so library and
+    codec initialization is paid once, not once per clip.
+    """
+    import av  # noqa: F401
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        op = message[0]
+        if op == "ping":
+            conn.send(("pong",))
+        elif op == "decode":
+            try:
+                pcm = _decode_with_av(message[1], sample_rate)
+                conn.send(("ok", pcm.tobytes()))
+            except Exception as e:
+                conn.send(("error", str(e)))
+        elif op == "stop":
+            return
+
+
+class _Worker:
+    def __init__(self, ctx, index: int, sample_rate: int):
+        self.ctx = ctx
+        self.index = index
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.sample_rate),
+            name=f"audio-decoder-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop(self):
+        try:
+            self.conn.send(("stop",))
+        except Exception:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def request(self, message: tuple, timeout: float):
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"decoder worker {self.index} timed out after {timeout}s")
+        return self.conn.recv()
+
+
+class DecoderPool:
+    """
+    Pool of long-lived decoder processes that take compressed audio bytes
+    (webm/ogg/mp3) over a pipe and return resampled mono int16 PCM.
+
+    A worker that crashes, hangs past `timeout` or fails a health check is
+    killed and replaced; the request that hit it raises so the caller can fall
+    back to another decode path.
+    """
+
+    def __init__(self, size: int, sample_rate: int = SAMPLE_RATE, timeout: float = 10.0,
+                 health_interval: float = 30.0):
+        self.size = size
+        self.sample_rate = sample_rate
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = [_Worker(self._ctx, i, sample_rate) for i in range(size)]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._closed = threading.Event()
+        self._health_thread = threading.Thread(target=self._health_loop, name="audio-decoder-health", daemon=True)
+        self._health_thread.start()
+
+    def _restart(self, worker: _Worker, reason: str):
+        logging.warning(f"Restarting audio decoder worker {worker.index}: {reason}")
+        self.restarts += 1
+        try:
+            worker.restart()
+        except Exception as e:
+            logging.error(f"Audio decoder worker {worker.index} failed to restart: {e}")
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if self._closed.is_set():
+            raise RuntimeError("Decoder pool is closed")
+        worker = self._idle.get()
+        try:
+            with worker.lock:
+                if not worker.process.is_alive():
+                    self._restart(worker, "process exited")
+                try:
+                    reply = worker.request(("decode", data), self.timeout)
+                except (EOFError, OSError, TimeoutError) as e:
+                    self._restart(worker, str(e) or e.__class__.__name__)
+                    raise RuntimeError(f"Decoder worker failed: {e}")
+        finally:
+            self._idle.put(worker)
+        if reply[0] != "ok":
+            raise RuntimeError(reply[1])
+        return np.frombuffer(reply[1], dtype=np.int16)
+
+    def warm(self):
+        """Wait for every worker to finish starting up (process spawn and PyAV import)."""
+        for worker in self._workers:
+            with worker.lock:
+                try:
+                    worker.request(("ping",), self.timeout)
+                except (EOFError, OSError, TimeoutError) as e:
+                    self._restart(worker, str(e) or e.__class__.__name__)
+
+    def health_check(self) -> dict:
+        """Ping every idle worker and replace any that are dead or unresponsive."""
+        healthy = 0
+        for worker in self._workers:
+            if not worker.lock.acquire(blocking=False):
+                healthy += 1  # busy decoding, so it is alive
+                continue
+            try:
+                if not worker.process.is_alive():
+                    self._restart(worker, "process exited")
+                    continue
+                try:
+                    reply = worker.request(("ping",), timeout=2.0)
+                    if reply[0] == "pong":
+                        healthy += 1
+                        continue
+                    self._restart(worker, f"unexpected reply {reply[0]}")
+                except (EOFError, OSError, TimeoutError) as e:
+                    self._restart(worker, str(e) or e.__class__.__name__)
+            finally:
+                worker.lock.release()
+        return {"size": self.size, "healthy": healthy, "restarts": self.restarts}
+
+    def _health_loop(self):
+        while not self._closed.wait(self.health_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                logging.warning(f"Audio decoder health check failed: {e}")
+
+    def close(self):
+        self._closed.set()
+        for worker in self._workers:
+            with worker.lock:
+                worker.stop()
+
+
+_pool: Optional[DecoderPool] = None
+_pool_lock = threading.Lock()
+_pyav_available: Optional[bool] = None
+
+
+def get_decoder_pool() -> Optional[DecoderPool]:
+    """
+    Lazily start the shared pool; returns None when AUDIO_DECODER_POOL_SIZE is
+    0 or PyAV is not installed. Without PyAV each worker would spawn ffmpeg per
+    clip anyway, so the pool would only add a process hop.
+    """
+    global _pool, _pyav_available
+    if settings.AUDIO_DECODER_POOL_SIZE <= 0:
+        return None
+    if _pyav_available is None:
+        _pyav_available = importlib.util.find_spec("av") is not None
+        if not _pyav_available:
+            logging.warning("PyAV is not installed; audio decoder pool disabled, decoding inline with ffmpeg")
+    if not _pyav_available:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DecoderPool(
+                    settings.AUDIO_DECODER_POOL_SIZE,
+                    timeout=settings.AUDIO_DECODER_TIMEOUT_SECONDS,
+                    health_interval=settings.AUDIO_DECODER_HEALTH_INTERVAL_SECONDS,
+                )
+    return _pool
+
+
+def warm_decoder_pool():
+    """Start the pool at startup so the first compressed upload does not pay for it."""
+    if settings.AUDIO_DECODE_MODE == "tempfile":
+        return
+    pool = get_decoder_pool()
+    if pool is not None:
+        pool.warm()
+
+
+def shutdown_decoder_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def decode_audio(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode uploaded audio to 16 kHz mono int16 PCM, sending compressed
+    formats to the warm decoder pool and parsing WAV in-process.
+    """
+    if is_wav(data):
+        return decode_to_pcm(data, sample_rate)
+    pool = get_decoder_pool()
+    if pool is None or sample_rate != pool.sample_rate:
+        return decode_to_pcm(data, sample_rate)
+    try:
+        return pool.decode(data)
+    except Exception as e:
+        logging.warning(f"Pooled audio decode failed, decoding inline: {e}")
+        return decode_to_pcm(data, sample_rate)
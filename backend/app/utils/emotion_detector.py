@@ -1,27 +1,156 @@
-from deepface import DeepFace
-import cv2
+import asyncio
+from typing import Hashable, List, Optional, Tuple
 import numpy as np
+from app.config import settings
+from app.utils.emotion_engine import EmotionEngine, create_emotion_engine, error_result
+from app.utils.image import decode_image
+from app.utils.face_tracker import FaceTracker
+from app.utils.frame_cache import FrameCache, dhash
+from app.utils.inference import BatchingExecutor, Overloaded
+from app.utils.metrics import stage
+from app.utils.model_registry import registry
 
-def detect_emotion_from_image(image_bytes):
+
+def _load_emotion_engine() -> EmotionEngine:
+    engine = create_emotion_engine(settings.EMOTION_BACKEND)
+    engine.load()
+    return engine
+
+
+def _warmup_emotion_engine(engine: EmotionEngine):
+    engine.analyze(np.zeros((96, 96, 3), dtype=np.uint8))
+
+
+registry.register("emotion", _load_emotion_engine, _warmup_emotion_engine)
+
+
+def detect_emotions_batch(images: List[np.ndarray], skip_detection: bool = False) -> List[dict]:
+    """
+    Run emotion analysis for a batch of decoded BGR frames on the engine
+    selected by EMOTION_BACKEND. With `skip_detection` the images are face
+    crops and only the classifier runs.
+    """
     try:
-        # Decode image bytes to OpenCV format
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        engine = registry.get("emotion")
+    except Exception as e:
+        return [error_result(str(e)) for _ in images]
+    return engine.analyze_batch(images, skip_detection)
+
+
+def _run_batch(items: List[Tuple[np.ndarray, bool]]) -> List[dict]:
+    """
+    Executor batch: full frames and tracked face crops go through separate
+    calls, timed per batch as the "detect" and "classify" stages.
+    """
+    results: List[Optional[dict]] = [None] * len(items)
+    for skip_detection, stage_name in ((False, "detect"), (True, "classify")):
+        indices = [i for i, (_, skip) in enumerate(items) if skip == skip_detection]
+        if indices:
+            with stage(stage_name):
+                batch = detect_emotions_batch([items[i][0] for i in indices], skip_detection)
+            for i, result in zip(indices, batch):
+                results[i] = result
+    return results
+
+
+emotion_executor = BatchingExecutor(
+    _run_batch,
+    max_batch_size=settings.EMOTION_MAX_BATCH_SIZE,
+    window_ms=settings.EMOTION_BATCH_WINDOW_MS,
+    name="emotion",
+    max_queue=settings.EMOTION_MAX_QUEUE,
+    max_per_key=settings.EMOTION_MAX_PER_USER,
+    deadline_ms=settings.EMOTION_DEADLINE_MS,
+)
 
-        # Analyze with DeepFace (emotion only)
-        result = DeepFace.analyze(img_path=img, actions=['emotion'], enforce_detection=False)
 
-        dominant_emotion = result[0]['dominant_emotion']
-        emotion_score = result[0]['emotion'][dominant_emotion]
+def emotion_degraded() -> bool:
+    """True while the emotion queue is loaded enough to skip scheduled face detection."""
+    return emotion_executor.max_queue > 0 and emotion_executor.load() >= settings.INFERENCE_DEGRADE_LOAD
 
-        return {
-            "emotion": dominant_emotion,
-            "confidence": float(round(emotion_score / 100, 2))
-        }
 
+async def analyze_frame(img: np.ndarray, tracker: Optional[FaceTracker] = None,
+                        cache: Optional[FrameCache] = None, key: Optional[Hashable] = None) -> dict:
+    """
+    Queue a decoded frame on the shared batching executor and wait for its result.
+    With a tracker, frames between full detections are cropped to the tracked
+    face and only classified; those results carry "tracked": true. While the
+    queue is degraded, tracking continues past the redetect schedule and the
+    result also carries "degraded": true. With a cache, a frame nearly
+    identical to a recent one reuses its result and carries "cached": true.
+    `key` (the caller's user id) is used for per-user fairness.
+
+    Raises `Overloaded` when admission control refuses or drops the frame.
+    """
+    frame_hash = None
+    if cache is not None and settings.FRAME_CACHE_ENABLED:
+        frame_hash = dhash(img)
+        cached = cache.get(frame_hash)
+        if cached is not None:
+            return {**cached, "cached": True}
+    roi, degraded = None, False
+    if tracker is not None and settings.FACE_TRACKING_ENABLED:
+        roi = tracker.roi(img)
+        if roi is None and emotion_degraded():
+            roi = tracker.roi(img, force=True)
+            degraded = roi is not None
+    try:
+        if roi is None:
+            result = await emotion_executor.submit((img, False), key)
+        else:
+            result = await emotion_executor.submit((roi, True), key)
+            if result.get("emotion") != "error":
+                result["box"] = list(tracker.box)
+                result["tracked"] = True
+                if degraded:
+                    result["degraded"] = True
+    except Overloaded:
+        raise
+    except Exception as e:
+        result = error_result(str(e))
+    if tracker is not None:
+        tracker.update(result, roi is not None, img.shape)
+    if frame_hash is not None:
+        cache.put(frame_hash, result)
+    return result
+
+
+async def analyze_frames(images: List[np.ndarray], key: Optional[Hashable] = None) -> List[dict]:
+    """
+    Score an ordered sequence of frames (a burst or a sampled clip) on the
+    shared batching executor. A frame nearly identical to the previous scored
+    one (dHash, FRAME_CACHE_MAX_DISTANCE) reuses its result and carries
+    "cached": true. No more frames are queued at once than the per-user
+    limit allows, so a long clip waits its turn instead of being refused.
+
+    Raises `Overloaded` when admission control refuses or drops a frame.
+    """
+    owners = list(range(len(images)))
+    if settings.FRAME_CACHE_ENABLED:
+        hashes = [dhash(img) for img in images]
+        for i in range(1, len(images)):
+            owner = owners[i - 1]
+            if (hashes[i] ^ hashes[owner]).bit_count() <= settings.FRAME_CACHE_MAX_DISTANCE:
+                owners[i] = owner
+    unique = sorted(set(owners))
+    slots = asyncio.Semaphore(emotion_executor.max_per_key or emotion_executor.max_batch_size)
+
+    async def score(i: int) -> dict:
+        async with slots:
+            return await emotion_executor.submit((images[i], False), key)
+
+    outcomes = await asyncio.gather(*(score(i) for i in unique), return_exceptions=True)
+    scored = {}
+    for i, outcome in zip(unique, outcomes):
+        if isinstance(outcome, Overloaded):
+            raise outcome
+        scored[i] = error_result(str(outcome)) if isinstance(outcome, BaseException) else outcome
+    return [scored[i] if owner == i else {**scored[owner], "cached": True} for i, owner in enumerate(owners)]
+
+
+def detect_emotion_from_image(image_bytes):
+    try:
+        img = decode_image(image_bytes)
     except Exception as e:
-        return {
-            "emotion": "error",
-            "confidence": 0.0,
-            "message": str(e)
-        }
+        return error_result(str(e))
+    return detect_emotions_batch([img])[0]
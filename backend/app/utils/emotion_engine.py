@@ -0,0 +1,270 @@
+import abc
+import logging
+import threading
+from typing import List, Optional
+import cv2
+import numpy as np
+from app.config import settings
+
+
+def error_result(message: str) -> dict:
+    return {
+        "emotion": "error",
+        "confidence": 0.0,
+        "message": message
+    }
+
+
+def _full_frame_box(img: np.ndarray) -> List[int]:
+    return [0, 0, int(img.shape[1]), int(img.shape[0])]
+
+
+class EmotionEngine(abc.ABC):
+    """
+    Face emotion backend. Engines take decoded BGR frames and return one
+    result per frame: {"emotion", "confidence" (0-1), "box" [x, y, w, h]}.
+    With `skip_detection` the frames are already face crops and only the
+    classifier runs. When no face is found the whole frame is classified and
+    the box covers the whole frame, as DeepFace does.
+    """
+
+    name = "base"
+
+    def load(self):
+        """Load model weights ahead of the first request (optional)."""
+
+    @abc.abstractmethod
+    def analyze_batch(self, images: List[np.ndarray], skip_detection: bool = False) -> List[dict]:
+        """One result per frame, in order."""
+
+    def analyze(self, img: np.ndarray, skip_detection: bool = False) -> dict:
+        return self.analyze_batch([img], skip_detection)[0]
+
+
+class DeepFaceEngine(EmotionEngine):
+    """DeepFace (TensorFlow) with its default detector."""
+
+    name = "deepface"
+
+    def __init__(self):
+        self._deepface = None
+
+    def load(self):
+        if self._deepface is None:
+            # TensorFlow comes in with DeepFace, so this import is deferred to load time
+            from deepface import DeepFace
+            try:
+                DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+            except TypeError:
+                DeepFace.build_model("Emotion")  # DeepFace < 0.0.90
+            except AttributeError:
+                pass
+            self._deepface = DeepFace
+        return self._deepface
+
+    @staticmethod
+    def _kwargs(skip_detection: bool) -> dict:
+        kwargs = {"actions": ['emotion'], "enforce_detection": False}
+        if skip_detection:
+            # The image is already a face crop: run the classifier only
+            kwargs["detector_backend"] = "skip"
+        return kwargs
+
+    @staticmethod
+    def _format(faces) -> dict:
+        # DeepFace returns one entry per detected face; the first is the most prominent
+        face = faces[0] if isinstance(faces, list) else faces
+        dominant_emotion = face['dominant_emotion']
+        emotion_score = face['emotion'][dominant_emotion]
+        result = {
+            "emotion": dominant_emotion,
+            "confidence": float(round(emotion_score / 100, 2))
+        }
+        region = face.get('region')
+        if region:
+            result["box"] = [int(region.get(k, 0)) for k in ("x", "y", "w", "h")]
+        return result
+
+    def _analyze_one(self, img: np.ndarray, skip_detection: bool) -> dict:
+        try:
+            return self._format(self.load().analyze(img_path=img, **self._kwargs(skip_detection)))
+        except Exception as e:
+            return error_result(str(e))
+
+    def analyze_batch(self, images: List[np.ndarray], skip_detection: bool = False) -> List[dict]:
+        """
+        One DeepFace call for the whole batch. Older DeepFace releases only
+        accept one image per call, in which case frames run one after another.
+        """
+        if len(images) > 1:
+            try:
+                results = self.load().analyze(img_path=list(images), **self._kwargs(skip_detection))
+                if isinstance(results, list) and len(results) == len(images) and all(isinstance(r, list) for r in results):
+                    return [self._format(r) for r in results]
+            except Exception as e:
+                logging.debug(f"Batched DeepFace.analyze unavailable, falling back to per-frame: {e}")
+        return [self._analyze_one(img, skip_detection) for img in images]
+
+
+class FEREngine(EmotionEngine):
+    """The `fer` package (Keras classifier, MTCNN or Haar cascade detector)."""
+
+    name = "fer"
+
+    def __init__(self, mtcnn: bool = True):
+        self.mtcnn = mtcnn
+        self._detector = None
+
+    def load(self):
+        if self._detector is None:
+            from fer import FER
+            self._detector = FER(mtcnn=self.mtcnn)
+        return self._detector
+
+    def _analyze_one(self, img: np.ndarray, skip_detection: bool) -> dict:
+        try:
+            detector = self.load()
+            box = _full_frame_box(img)
+            faces = None if skip_detection else detector.detect_emotions(img)
+            if not faces:
+                faces = detector.detect_emotions(img, face_rectangles=[tuple(box)])
+            if not faces:
+                return {"emotion": "neutral", "confidence": 0.0, "box": box}
+            face = faces[0]
+            emotions = face["emotions"]
+            top_emotion = max(emotions, key=emotions.get)
+            return {
+                "emotion": top_emotion,
+                "confidence": float(round(emotions[top_emotion], 2)),
+                "box": [int(v) for v in face["box"]],
+            }
+        except Exception as e:
+            return error_result(str(e))
+
+    def analyze_batch(self, images: List[np.ndarray], skip_detection: bool = False) -> List[dict]:
+        return [self._analyze_one(img, skip_detection) for img in images]
+
+
+class OnnxEngine(EmotionEngine):
+    """
+    ONNX Runtime on CPU with two exported graphs: an UltraFace-style detector
+    (input 1x3xHxW normalized RGB; outputs scores [1, N, 2] and corner boxes
+    [1, N, 4] in 0-1 coordinates) and a FER+ classifier (input Nx1x64x64
+    grayscale; 8 logits). Thread counts are set per session so several workers
+    can share a host without oversubscribing it.
+    """
+
+    name = "onnx"
+    # FER+ output order, named as the DeepFace labels where they overlap
+    LABELS = ["neutral", "happy", "surprise", "sad", "angry", "disgust", "fear", "contempt"]
+
+    def __init__(self, detector_path: str, classifier_path: str, intra_op_threads: int = 0,
+                 inter_op_threads: int = 0, score_threshold: float = 0.7, detector_size=(320, 240)):
+        self.detector_path = detector_path
+        self.classifier_path = classifier_path
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.score_threshold = score_threshold
+        self.detector_size = detector_size
+        self._detector = None
+        self._classifier = None
+        self._classifier_batches = True
+        self._lock = threading.Lock()
+
+    def _session(self, path: str):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+    def load(self):
+        if self._classifier is None:
+            with self._lock:
+                if self._classifier is None:
+                    try:
+                        import onnxruntime  # noqa: F401
+                    except Exception:
+                        raise RuntimeError("onnxruntime not installed. Please add 'onnxruntime' to requirements.txt")
+                    if not self.detector_path or not self.classifier_path:
+                        raise RuntimeError("EMOTION_ONNX_DETECTOR and EMOTION_ONNX_CLASSIFIER must point to .onnx files")
+                    self._detector = self._session(self.detector_path)
+                    self._classifier = self._session(self.classifier_path)
+        return self._classifier
+
+    def _detect(self, img: np.ndarray) -> Optional[List[int]]:
+        height, width = img.shape[:2]
+        blob = cv2.resize(img, self.detector_size)
+        blob = cv2.cvtColor(blob, cv2.COLOR_BGR2RGB).astype(np.float32)
+        blob = ((blob - 127.0) / 128.0).transpose(2, 0, 1)[np.newaxis]
+        scores, boxes = self._detector.run(None, {self._detector.get_inputs()[0].name: blob})
+        scores, boxes = scores[0, :, 1], boxes[0]
+        keep = scores > self.score_threshold
+        if not keep.any():
+            return None
+        # The most confident face is the candidate; no NMS needed for a single box
+        x0, y0, x1, y1 = boxes[keep][int(np.argmax(scores[keep]))]
+        x0, x1 = int(max(0.0, x0) * width), int(min(1.0, x1) * width)
+        y0, y1 = int(max(0.0, y0) * height), int(min(1.0, y1) * height)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        return [x0, y0, x1 - x0, y1 - y0]
+
+    @staticmethod
+    def _face_tensor(img: np.ndarray, box: List[int]) -> np.ndarray:
+        x, y, w, h = box
+        gray = cv2.cvtColor(img[y:y + h, x:x + w], cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img[y:y + h, x:x + w]
+        return cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA).astype(np.float32)[np.newaxis]
+
+    def _classify(self, faces: np.ndarray) -> np.ndarray:
+        name = self._classifier.get_inputs()[0].name
+        if self._classifier_batches and len(faces) > 1:
+            try:
+                return self._classifier.run(None, {name: faces})[0]
+            except Exception as e:
+                # Graphs exported with a fixed batch dimension of 1
+                logging.info(f"ONNX emotion classifier does not batch, running per face: {e}")
+                self._classifier_batches = False
+        return np.concatenate([self._classifier.run(None, {name: faces[i:i + 1]})[0] for i in range(len(faces))])
+
+    def analyze_batch(self, images: List[np.ndarray], skip_detection: bool = False) -> List[dict]:
+        try:
+            self.load()
+            boxes = []
+            for img in images:
+                box = None if skip_detection else self._detect(img)
+                boxes.append(box or _full_frame_box(img))
+            faces = np.stack([self._face_tensor(img, box) for img, box in zip(images, boxes)])
+            logits = self._classify(faces).reshape(len(images), -1)
+        except Exception as e:
+            return [error_result(str(e)) for _ in images]
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        results = []
+        for row, box in zip(probs, boxes):
+            top = int(np.argmax(row))
+            results.append({"emotion": self.LABELS[top], "confidence": float(round(row[top], 2)), "box": box})
+        return results
+
+
+def create_emotion_engine(backend: str) -> EmotionEngine:
+    backend = (backend or "deepface").lower()
+    if backend == "deepface":
+        return DeepFaceEngine()
+    if backend == "fer":
+        return FEREngine(mtcnn=settings.FER_MTCNN)
+    if backend == "onnx":
+        return OnnxEngine(
+            settings.EMOTION_ONNX_DETECTOR,
+            settings.EMOTION_ONNX_CLASSIFIER,
+            intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+            inter_op_threads=settings.ONNX_INTER_OP_THREADS,
+            score_threshold=settings.EMOTION_ONNX_FACE_THRESHOLD,
+        )
+    if backend == "remote":
+        # Models live in the shared model server (python -m app.model_server)
+        from app.model_server import RemoteEmotionEngine
+        return RemoteEmotionEngine()
+    raise ValueError(f"Unknown emotion backend: {backend}")
@@ -0,0 +1,59 @@
+import time
+from app.config import settings
+from app.utils.face_tracker import FaceTracker
+from app.utils.frame_cache import FrameCache
+
+
+class EmotionSession:
+    """
+    Server-side state for one interview's webcam stream: frame sequence
+    numbers, the face tracker and frame cache, the last detected face box and
+    an exponentially weighted rolling confidence. Owned by the interview's
+    InterviewSession (see `InterviewSession.emotion_stream`).
+    """
+
+    def __init__(self, interview_id: str, user_id: str, alpha: float = settings.EMOTION_CONFIDENCE_ALPHA):
+        self.interview_id = interview_id
+        self.user_id = user_id
+        self.alpha = alpha
+        self.seq = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.last_box = None
+        self.tracker = FaceTracker()
+        self.frame_cache = FrameCache()
+        self.last_result = None
+        self.rolling_confidence = None
+        self.updated_at = time.monotonic()
+
+    def next_seq(self) -> int:
+        self.seq += 1
+        self.updated_at = time.monotonic()
+        return self.seq
+
+    def update(self, result: dict) -> dict:
+        self.frames_processed += 1
+        self.updated_at = time.monotonic()
+        self.last_result = result
+        if result.get("emotion") == "error":
+            return result
+        if result.get("box"):
+            self.last_box = result["box"]
+        confidence = float(result.get("confidence", 0.0))
+        if self.rolling_confidence is None:
+            self.rolling_confidence = confidence
+        else:
+            self.rolling_confidence = self.alpha * confidence + (1 - self.alpha) * self.rolling_confidence
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "seq": self.seq,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "last_box": self.last_box,
+            "tracking": self.tracker.stats(),
+            "frame_cache": self.frame_cache.stats(),
+            "rolling_confidence": round(self.rolling_confidence, 4) if self.rolling_confidence is not None else None,
+        }
+
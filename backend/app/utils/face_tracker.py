@@ -0,0 +1,78 @@
+from typing import Optional
+import numpy as np
+from app.config import settings
+
+
+class FaceTracker:
+    """
+    Remembers the face box from the last full detection so later frames can
+    be cropped to a padded region around it and sent straight to the emotion
+    classifier. A seated interviewee barely moves between frames, so full
+    detection only reruns every `redetect_every` frames, when confidence drops
+    by more than `confidence_drop` from the last detection, or when the face
+    is lost.
+    """
+
+    def __init__(self, redetect_every: int = settings.FACE_REDETECT_EVERY,
+                 padding: float = settings.FACE_ROI_PADDING,
+                 confidence_drop: float = settings.FACE_REDETECT_CONFIDENCE_DROP):
+        self.redetect_every = max(1, redetect_every)
+        self.padding = padding
+        self.confidence_drop = confidence_drop
+        self.box = None
+        self.reference_confidence = None
+        self.frames_since_detection = 0
+        self.detections = 0
+        self.tracked_frames = 0
+
+    def roi(self, img: np.ndarray, force: bool = False) -> Optional[np.ndarray]:
+        """
+        Padded crop around the tracked face, or None when a full detection is
+        due. `force` keeps tracking past the redetect schedule (under load).
+        """
+        if self.box is None or (not force and self.frames_since_detection + 1 >= self.redetect_every):
+            return None
+        height, width = img.shape[:2]
+        x, y, w, h = self.box
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(width, x + w + pad_x), min(height, y + h + pad_y)
+        if x1 - x0 < 24 or y1 - y0 < 24:
+            return None
+        return img[y0:y1, x0:x1]
+
+    def reset(self):
+        self.box = None
+        self.reference_confidence = None
+        self.frames_since_detection = 0
+
+    def update(self, result: dict, tracked: bool, frame_shape):
+        if not result or result.get("emotion") == "error":
+            self.reset()
+            return
+        confidence = float(result.get("confidence", 0.0))
+        if tracked:
+            self.tracked_frames += 1
+            self.frames_since_detection += 1
+            if self.reference_confidence is not None and self.reference_confidence - confidence > self.confidence_drop:
+                self.frames_since_detection = self.redetect_every
+            return
+        self.detections += 1
+        box = result.get("box")
+        height, width = frame_shape[:2]
+        # Without a face the detector falls back to the whole frame
+        if not box or (box[2] >= 0.95 * width and box[3] >= 0.95 * height):
+            self.reset()
+            return
+        self.box = box
+        self.reference_confidence = confidence
+        self.frames_since_detection = 0
+
+    def stats(self) -> dict:
+        total = self.detections + self.tracked_frames
+        return {
+            "box": self.box,
+            "detections": self.detections,
+            "tracked_frames": self.tracked_frames,
+            "tracked_ratio": round(self.tracked_frames / total, 3) if total else 0.0,
+        }
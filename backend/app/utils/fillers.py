@@ -0,0 +1,154 @@
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.config import settings
+
+DEFAULT_FILLERS = [
+    "um", "uh", "like", "you know", "so", "actually", "basically", "literally",
+    "right", "okay", "well", "hmm", "erm", "ah", "eh"
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_END = object()
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Lower-cased word tokens with their (start, end) character offsets."""
+    return [(m.group(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text.lower())]
+
+
+class FillerLexicon:
+    """
+    A set of single- and multi-word fillers compiled into a token trie.
+
+    Text is tokenized once and matched in a single left-to-right pass, taking
+    the longest filler that starts at each token ("you know" wins over "you").
+    Matching is on whole words, so "so" does not match inside "also".
+    """
+
+    def __init__(self, fillers: Iterable[str]):
+        self.fillers = []
+        self._trie: dict = {}
+        for filler in fillers:
+            words = [t for t, _, _ in tokenize(filler)]
+            if not words:
+                continue
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_END] = " ".join(words)
+            self.fillers.append(node[_END])
+
+    def _matches(self, tokens: Sequence[Tuple[str, int, int]]):
+        i, n = 0, len(tokens)
+        while i < n:
+            node = self._trie.get(tokens[i][0])
+            match, j = None, i
+            while node is not None:
+                if _END in node:
+                    match = (node[_END], i, j)
+                j += 1
+                if j >= n:
+                    break
+                node = node.get(tokens[j][0])
+            if match:
+                yield match
+                i = match[2] + 1
+            else:
+                i += 1
+
+    def count(self, text: str) -> Dict[str, int]:
+        return dict(Counter(filler for filler, _, _ in self._matches(tokenize(text))))
+
+    def analyze(self, text: str, word_times: Optional[Sequence[Tuple[float, float]]] = None) -> dict:
+        """
+        Count fillers and report where each one occurs.
+
+        `word_times` may give (start, end) seconds for every token of `text`
+        (for example from ASR word timings); occurrences then carry timestamps.
+        """
+        tokens = tokenize(text)
+        if word_times is not None and len(word_times) != len(tokens):
+            word_times = None
+        counts: Counter = Counter()
+        occurrences = []
+        for filler, first, last in self._matches(tokens):
+            counts[filler] += 1
+            occurrence = {
+                "filler": filler,
+                "token": first,
+                "start_char": tokens[first][1],
+                "end_char": tokens[last][2],
+            }
+            if word_times is not None:
+                occurrence["start"] = word_times[first][0]
+                occurrence["end"] = word_times[last][1]
+            occurrences.append(occurrence)
+        total = sum(counts.values())
+        return {
+            "counts": dict(counts),
+            "occurrences": occurrences,
+            "total": total,
+            "words": len(tokens),
+            "rate_per_100_words": round(100.0 * total / len(tokens), 2) if tokens else 0.0,
+        }
+
+    def analyze_corpus(self, texts: Iterable[str]) -> dict:
+        """Aggregate filler counts over many transcripts (e.g. a user's stored history)."""
+        counts: Counter = Counter()
+        words = 0
+        documents = 0
+        for text in texts:
+            tokens = tokenize(text or "")
+            words += len(tokens)
+            documents += 1
+            counts.update(filler for filler, _, _ in self._matches(tokens))
+        total = sum(counts.values())
+        return {
+            "counts": dict(counts),
+            "total": total,
+            "words": words,
+            "documents": documents,
+            "rate_per_100_words": round(100.0 * total / words, 2) if words else 0.0,
+        }
+
+
+_default_lexicon = FillerLexicon(DEFAULT_FILLERS)
+_tenant_lexicons: Dict[str, FillerLexicon] = {}
+_loaded = False
+_lock = threading.Lock()
+
+
+def _load_tenant_lexicons():
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+        path = settings.FILLER_LEXICON_FILE
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                for tenant, words in json.load(f).items():
+                    _tenant_lexicons[str(tenant)] = FillerLexicon(words)
+        except Exception as e:
+            logging.warning(f"Could not load filler lexicons from {path}: {e}")
+
+
+def register_lexicon(tenant: str, fillers: Iterable[str]) -> FillerLexicon:
+    lexicon = FillerLexicon(fillers)
+    _tenant_lexicons[str(tenant)] = lexicon
+    return lexicon
+
+
+def get_lexicon(tenant: Optional[str] = None) -> FillerLexicon:
+    """The tenant's lexicon (from FILLER_LEXICON_FILE or `register_lexicon`), else the default."""
+    if not _loaded:
+        _load_tenant_lexicons()
+    if tenant is not None:
+        return _tenant_lexicons.get(str(tenant), _default_lexicon)
+    return _default_lexicon
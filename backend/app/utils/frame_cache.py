@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+import cv2
+import numpy as np
+from app.config import settings
+
+
+def dhash(img: np.ndarray, size: int = 8) -> int:
+    """
+    64-bit difference hash: shrink to (size+1) x size grayscale and record
+    whether each pixel is brighter than its right neighbour. Small changes in
+    lighting or noise flip few bits; a different pose or expression flips many.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class FrameCache:
+    """
+    Recent emotion results keyed by frame hash, bounded to `max_entries`
+    (least recently used is evicted). A frame whose hash is within
+    `max_distance` bits of a cached one that is younger than `max_age`
+    seconds reuses that result instead of running inference.
+    """
+
+    def __init__(self, max_entries: int = settings.FRAME_CACHE_SIZE,
+                 max_distance: int = settings.FRAME_CACHE_MAX_DISTANCE,
+                 max_age: float = settings.FRAME_CACHE_MAX_AGE_SECONDS):
+        self.max_entries = max(1, max_entries)
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, frame_hash: int) -> Optional[dict]:
+        cutoff = time.monotonic() - self.max_age
+        for key in reversed(self._entries):
+            stored_at, result = self._entries[key]
+            if stored_at >= cutoff and (key ^ frame_hash).bit_count() <= self.max_distance:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, frame_hash: int, result: dict):
+        if not result or result.get("emotion") == "error":
+            return
+        self._entries[frame_hash] = (time.monotonic(), result)
+        self._entries.move_to_end(frame_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
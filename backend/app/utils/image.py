@@ -0,0 +1,67 @@
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from app.config import settings
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) share the range but do not
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_REDUCED_MODES = [(8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)]
+
+
+def jpeg_size(data) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) from a JPEG's SOF segment, read from the header without
+    decoding any pixels. None if the data is not a JPEG or has no SOF.
+    """
+    view = memoryview(data)
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    i = 2
+    while i + 4 <= len(view):
+        if view[i] != 0xFF:
+            return None
+        marker = view[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # markers without a length
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):  # end of image / start of scan: no SOF before pixels
+            return None
+        length = (view[i + 2] << 8) | view[i + 3]
+        if marker in _SOF_MARKERS and i + 9 <= len(view):
+            height = (view[i + 5] << 8) | view[i + 6]
+            width = (view[i + 7] << 8) | view[i + 8]
+            return width, height
+        i += 2 + length
+    return None
+
+
+def _decode_flag(data, min_side: int) -> int:
+    size = jpeg_size(data) if min_side else None
+    if size is None:
+        return cv2.IMREAD_COLOR
+    short_side = min(size)
+    for factor, flag in _REDUCED_MODES:
+        if short_side // factor >= min_side:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_image(image_bytes, min_side: Optional[int] = None) -> np.ndarray:
+    """
+    Decode JPEG/PNG bytes into a BGR OpenCV image.
+
+    Large JPEGs are decoded at 1/2, 1/4 or 1/8 scale by libjpeg itself (DCT
+    scaling, far cheaper than a full decode plus resize), as long as the
+    shorter side stays at least `min_side` pixels (EMOTION_DECODE_MIN_SIDE by
+    default; 0 always decodes at full size).
+    """
+    if min_side is None:
+        min_side = settings.EMOTION_DECODE_MIN_SIDE
+    np_arr = np.frombuffer(image_bytes, np.uint8)
+    img = cv2.imdecode(np_arr, _decode_flag(image_bytes, min_side))
+    if img is None:
+        raise ValueError("Could not decode image")
+    return img
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import math
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from app.utils.metrics import Counter, Gauge, Histogram
+
+_executors = weakref.WeakSet()
+
+QUEUE_WAIT_SECONDS = Histogram(
+    "mockint_inference_queue_wait_seconds", "Time items wait in an inference queue before their batch runs.", ["executor"]
+)
+BATCH_SECONDS = Histogram("mockint_inference_batch_seconds", "Worker time per inference batch.", ["executor"])
+BATCH_SIZE = Histogram(
+    "mockint_inference_batch_size", "Items per inference batch.", ["executor"], buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+SHED_TOTAL = Counter("mockint_inference_shed_total", "Items refused or dropped by admission control.", ["executor", "reason"])
+QUEUE_DEPTH = Gauge(
+    "mockint_inference_queue_depth", "Items waiting in each inference queue.", ["executor"],
+    fn=lambda: [({"executor": ex.name}, ex.queue_depth()) for ex in list(_executors)],
+)
+
+
+class Overloaded(Exception):
+    """
+    Work refused or dropped by admission control. `status` is 429 when one
+    caller is over its share of the queue and 503 when the executor itself is
+    saturated or the work went stale; `retry_after` is in whole seconds.
+    """
+
+    def __init__(self, message: str, retry_after: int, status: int = 503):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status = status
+
+
+class BatchingExecutor:
+    """
+    Collects items submitted by concurrent requests into micro-batches and runs
+    them through `batch_fn` on a dedicated worker thread, so the event loop is
+    never blocked by model inference.
+
+    `batch_fn` receives a list of items and must return a list of results in the
+    same order. A batch is dispatched once `max_batch_size` items are queued or
+    `window_ms` has passed since the first item of the batch arrived.
+
+    Admission control (each limit is off at 0): `max_queue` bounds the number
+    of waiting items, `max_per_key` bounds the items one caller (a user id)
+    may have waiting or running, and items still queued `deadline_ms` after
+    submission are dropped instead of run. All three fail with `Overloaded`.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 window_ms: float = 20.0, name: str = "inference", max_queue: int = 0,
+                 max_per_key: int = 0, deadline_ms: float = 0):
+        self.name = name
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self.max_queue = max(0, int(max_queue))
+        self.max_per_key = max(0, int(max_per_key))
+        self.deadline = max(0.0, float(deadline_ms)) / 1000.0
+        self.shed = {"queue_full": 0, "per_key": 0, "expired": 0}
+        self._per_key: Dict[Hashable, int] = {}
+        # Moving average of worker time per item, for Retry-After estimates
+        self._item_seconds = 0.0
+        self._batch_fn = batch_fn
+        _executors.add(self)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, fut, _, _ = self._queue.get_nowait()
+                if not fut.done():
+                    fut.set_exception(RuntimeError(f"{self.name} executor stopped"))
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def load(self) -> float:
+        """Queue fill ratio (0-1); always 0 for an unbounded queue."""
+        return self.queue_depth() / self.max_queue if self.max_queue else 0.0
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, at least 1."""
+        return max(1, math.ceil(self.queue_depth() * self._item_seconds))
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "max_queue": self.max_queue,
+            "load": round(self.load(), 3),
+            "item_ms": round(self._item_seconds * 1000, 1),
+            "shed": dict(self.shed),
+        }
+
+    def _refuse(self, reason: str, message: str, status: int = 503) -> Overloaded:
+        self.shed[reason] += 1
+        SHED_TOTAL.inc(executor=self.name, reason=reason)
+        return Overloaded(message, self.retry_after(), status)
+
+    async def submit(self, item: Any, key: Optional[Hashable] = None) -> Any:
+        """
+        Queue one item and wait for its result. `key` identifies the caller for
+        the per-key limit. Raises `Overloaded` when the item is refused or goes
+        stale before a worker picks it up.
+        """
+        self.start()
+        if self.max_queue and self.queue_depth() >= self.max_queue:
+            raise self._refuse("queue_full", f"{self.name} queue is full")
+        if key is not None and self.max_per_key and self._per_key.get(key, 0) >= self.max_per_key:
+            raise self._refuse("per_key", f"Too many {self.name} requests in flight", status=429)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        expires_at = loop.time() + self.deadline if self.deadline else None
+        if key is not None:
+            self._per_key[key] = self._per_key.get(key, 0) + 1
+        try:
+            self._queue.put_nowait((item, fut, expires_at, loop.time()))
+            return await fut
+        finally:
+            if key is not None:
+                remaining = self._per_key.pop(key) - 1
+                if remaining > 0:
+                    self._per_key[key] = remaining
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Requests that were cancelled (client disconnected) or waited past their
+        # deadline are dropped; a stale result is of no use to a live client
+        now = loop.time()
+        live = []
+        for item, fut, expires_at, queued_at in batch:
+            if fut.done():
+                continue
+            QUEUE_WAIT_SECONDS.observe(now - queued_at, executor=self.name)
+            if expires_at is not None and now > expires_at:
+                fut.set_exception(self._refuse("expired", f"{self.name} request expired in the queue"))
+                continue
+            live.append((item, fut))
+        return live
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            started = loop.time()
+            try:
+                results = await loop.run_in_executor(self._pool, self._batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name} batch returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                logging.warning(f"{self.name} batch of {len(items)} failed: {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            elapsed = loop.time() - started
+            BATCH_SECONDS.observe(elapsed, executor=self.name)
+            BATCH_SIZE.observe(len(items), executor=self.name)
+            per_item = elapsed / len(items)
+            self._item_seconds = per_item if not self._item_seconds else 0.8 * self._item_seconds + 0.2 * per_item
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
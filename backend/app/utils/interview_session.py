@@ -0,0 +1,239 @@
+"""
+Live interview sessions: one registry, keyed by interview id, holding the
+running aggregates of each interview in progress and its webcam stream state.
+
+Sessions live in this process's memory. The session sweeper checkpoints every
+changed session to its interview row, so a restart loses at most one
+SESSION_SWEEP_INTERVAL_SECONDS of results, and a stream that reconnects
+afterwards resumes from the checkpoint. Results for an interview must all
+reach the same process: run the API with a single worker, or route requests
+to workers by interview id (sticky sessions). With plain round-robin across
+workers, results landing on a worker without the session are not recorded.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from app.config import settings
+from app.utils.emotion_session import EmotionSession
+from app.utils.timeseries import ConfidenceSeries
+
+
+class ConfidenceStats:
+    """
+    Running duration-weighted statistics over confidence samples (0-100).
+    Each `add` is O(1) and uses West's incremental weighted mean/variance
+    update, so nothing is stored per sample.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.total_weight = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float, weight: float):
+        value = max(0.0, min(100.0, float(value)))
+        weight = max(0.0, float(weight))
+        self.samples += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if weight == 0:
+            return
+        new_weight = self.total_weight + weight
+        delta = value - self.mean
+        self.mean += delta * weight / new_weight
+        self._m2 += weight * delta * (value - self.mean)
+        self.total_weight = new_weight
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "ConfidenceStats":
+        """Continue from a stored `to_dict()` snapshot."""
+        stats = cls()
+        if data:
+            stats.samples = int(data.get("samples") or 0)
+            stats.total_weight = float(data.get("duration") or 0.0)
+            stats.mean = float(data.get("mean") or 0.0)
+            stats._m2 = float(data.get("std") or 0.0) ** 2 * stats.total_weight
+            stats.min = data.get("min")
+            stats.max = data.get("max")
+        return stats
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.total_weight if self.total_weight else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "duration": round(self.total_weight, 3),
+            "mean": round(self.mean, 4) if self.total_weight else 0.0,
+            "std": round(math.sqrt(self.variance), 4),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class InterviewSession:
+    """
+    Server-side aggregate for one live interview. Emotion and transcription
+    results are fed in as they are produced; `record()` builds the interview
+    row fields, written at each checkpoint and once more at the end.
+    """
+
+    def __init__(self, interview_id: str, user_id: str, job_role: Optional[str] = None, level: Optional[str] = None):
+        self.interview_id = interview_id
+        self.user_id = user_id
+        self.job_role = job_role
+        self.level = level
+        self.started_at = time.time()
+        self.updated_at = time.monotonic()
+        self.confidence = ConfidenceStats()
+        self.series = ConfidenceSeries(settings.CONFIDENCE_SERIES_PERIOD_SECONDS)
+        self.emotion_dwell: Dict[str, float] = {}
+        self.transcript: List[str] = []
+        self.filler_counts: Counter = Counter()
+        self.flushed = False
+        # Bumped on every change; checkpoints skip sessions already saved at this version
+        self.version = 0
+        self.saved_version = 0
+        self.write_lock = asyncio.Lock()
+        self._stream: Optional[EmotionSession] = None
+        self._last_emotion_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_row(cls, row: dict) -> "InterviewSession":
+        """Resume a session from its interview row, e.g. after a restart, continuing the stored aggregates."""
+        session = cls(str(row["id"]), str(row["user_id"]), job_role=row.get("job_role"), level=row.get("level"))
+        stats = row.get("confidence_stats") or {}
+        session.series = ConfidenceSeries.decode(row.get("confidence_series"), settings.CONFIDENCE_SERIES_PERIOD_SECONDS)
+        if stats.get("confidence"):
+            session.confidence = ConfidenceStats.from_dict(stats["confidence"])
+        else:
+            for value in session.series.values:
+                session.confidence.add(value, session.series.period)
+        session.emotion_dwell = dict(stats.get("emotion_dwell") or {})
+        if row.get("answer"):
+            session.transcript.append(row["answer"])
+        session.filler_counts.update(row.get("filler_words") or {})
+        return session
+
+    def emotion_stream(self) -> EmotionSession:
+        """The interview's webcam stream state (face tracker, frame cache, rolling confidence)."""
+        if self._stream is None:
+            self._stream = EmotionSession(self.interview_id, self.user_id)
+        return self._stream
+
+    def last_active(self) -> float:
+        """Monotonic time of the last result or streamed frame."""
+        if self._stream is None:
+            return self.updated_at
+        return max(self.updated_at, self._stream.updated_at)
+
+    def _sample_duration(self, duration: Optional[float]) -> float:
+        now = time.monotonic()
+        if duration is None:
+            if self._last_emotion_at is None:
+                duration = settings.SESSION_DEFAULT_SAMPLE_SECONDS
+            else:
+                duration = min(now - self._last_emotion_at, settings.SESSION_MAX_SAMPLE_SECONDS)
+        self._last_emotion_at = now
+        self.updated_at = now
+        return duration
+
+    def add_emotion(self, result: dict, duration: Optional[float] = None):
+        """
+        Record one emotion result. Without an explicit `duration`, a sample
+        covers the time since the previous one (capped), so irregular frame
+        rates are weighted correctly.
+        """
+        if not result or result.get("emotion") in (None, "error"):
+            return
+        with self._lock:
+            duration = self._sample_duration(duration)
+            value = float(result.get("confidence", 0.0)) * 100
+            self.confidence.add(value, duration)
+            self.series.append(value, duration)
+            emotion = result["emotion"]
+            self.emotion_dwell[emotion] = self.emotion_dwell.get(emotion, 0.0) + duration
+            self.version += 1
+
+    def add_transcript(self, text: str, filler_counts: Optional[Dict[str, int]] = None):
+        if not text:
+            return
+        with self._lock:
+            self.updated_at = time.monotonic()
+            self.transcript.append(text.strip())
+            self.filler_counts.update(filler_counts or {})
+            self.version += 1
+
+    def stats(self) -> dict:
+        return {
+            "confidence": self.confidence.to_dict(),
+            "emotion_dwell": {k: round(v, 3) for k, v in self.emotion_dwell.items()},
+            "transcript_segments": len(self.transcript),
+            "filler_words": dict(self.filler_counts),
+        }
+
+    def record(self) -> dict:
+        """Fields to write to the interview row; only what the session actually observed."""
+        record = {"confidence_stats": self.stats()}
+        if self.confidence.total_weight:
+            record["confidence"] = self.confidence.mean
+            record["confidence_series"] = self.series.encode()
+        if self.transcript:
+            record["answer"] = " ".join(self.transcript)
+            record["filler_words"] = dict(self.filler_counts)
+        return record
+
+
+_sessions: Dict[str, InterviewSession] = {}
+
+
+def start_session(interview_id: str, user_id: str, job_role: Optional[str] = None,
+                  level: Optional[str] = None) -> InterviewSession:
+    session = InterviewSession(str(interview_id), str(user_id), job_role=job_role, level=level)
+    _sessions[session.interview_id] = session
+    return session
+
+
+def resume_session(row: dict) -> InterviewSession:
+    """The live session for an interview row, resumed from the row if this process has none."""
+    session = get_interview_session(row["id"], row["user_id"])
+    if session is None:
+        session = InterviewSession.from_row(row)
+        _sessions[session.interview_id] = session
+    return session
+
+
+def get_interview_session(interview_id: Optional[str], user_id: Optional[str] = None) -> Optional[InterviewSession]:
+    """The live session for an interview, if it exists and (when given) belongs to `user_id`."""
+    if not interview_id:
+        return None
+    session = _sessions.get(str(interview_id))
+    if session is None or session.flushed:
+        return None
+    if user_id is not None and session.user_id != str(user_id):
+        return None
+    return session
+
+
+def pop_session(session: InterviewSession):
+    """Drop a session from the registry, unless it was already replaced by a resumed one."""
+    if _sessions.get(session.interview_id) is session:
+        del _sessions[session.interview_id]
+
+
+def live_sessions() -> List[InterviewSession]:
+    return [s for s in list(_sessions.values()) if not s.flushed]
+
+
+def idle_sessions(timeout: float) -> List[InterviewSession]:
+    cutoff = time.monotonic() - timeout
+    return [s for s in live_sessions() if s.last_active() < cutoff]
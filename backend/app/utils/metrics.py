@@ -0,0 +1,225 @@
+"""
+Lightweight in-process metrics rendered in the Prometheus text format, plus
+sampled structured logging. No client library: counters, gauges and
+histograms are plain dicts behind one lock each, cheap enough to update on
+every request and from the inference worker threads.
+
+    with stage("decode"):
+        img = decode_image(data)
+
+Every `stage` lands in the `mockint_stage_seconds{stage=...}` histogram.
+"""
+
+import abc
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.config import settings
+
+# Seconds; spans a cached DB read up to a long ASR clip
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: List["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Exposition lines for every label set."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    A settable value, or one read at scrape time from `fn`, which returns
+    (labels, value) pairs so one callback can report several label sets.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], Iterable[Tuple[dict, float]]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[str]:
+        if self.fn is not None:
+            try:
+                items = [(self._key(labels), value) for labels, value in self.fn()]
+            except Exception as e:
+                logging.warning(f"Metric {self.name} callback failed: {e}")
+                items = []
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in items:
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format (0.0.4)."""
+    return "\n".join(metric.render() for metric in _metrics) + "\n"
+
+
+STAGE_SECONDS = Histogram("mockint_stage_seconds", "Time spent in named request stages.", ["stage"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "mockint_http_request_seconds", "HTTP request latency by route template.", ["method", "route", "status"]
+)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block into mockint_stage_seconds{stage=name}."""
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request. Routes are
+    labelled by their template ("/interview/{interview_id}"), never the raw
+    path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status["code"],
+            )
+
+
+event_logger = logging.getLogger("mockint.events")
+if not event_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    event_logger.addHandler(_handler)
+    event_logger.setLevel(logging.INFO)
+    event_logger.propagate = False
+
+
+def log_event(event: str, sampled: bool = True, **fields):
+    """
+    One JSON log line. Sampled events are kept with probability
+    LOG_SAMPLE_RATE; pass identifiers and sizes here, never whole payloads.
+    """
+    if sampled and random.random() >= settings.LOG_SAMPLE_RATE:
+        return
+    event_logger.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+from app.utils.metrics import Gauge
+
+REGISTERED = "registered"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+# Loaded and usable, but the dummy inference raised; not counted as ready
+WARMUP_FAILED = "warmup_failed"
+
+
+class ModelEntry:
+    """
+    One lazily loaded model. `loader` runs on first use (or during warmup)
+    and its return value is cached; `warmup` runs one dummy inference on it
+    so graph building and allocator warmup happen before real traffic.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.loader = loader
+        self.warmup_fn = warmup
+        self.state = REGISTERED
+        self.model = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.warmed = False
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self.state in (READY, WARMUP_FAILED):
+            return self.model
+        with self._lock:
+            if self.state not in (READY, WARMUP_FAILED):
+                self.state = LOADING
+                started = time.perf_counter()
+                try:
+                    self.model = self.loader()
+                except Exception as e:
+                    self.state = FAILED
+                    self.error = str(e)
+                    raise
+                self.load_seconds = round(time.perf_counter() - started, 3)
+                self.error = None
+                self.state = READY
+                logging.info(f"Loaded model {self.name} in {self.load_seconds}s")
+        return self.model
+
+    def warm(self):
+        model = self.get()
+        if self.warmed or self.warmup_fn is None:
+            self.warmed = True
+            return
+        started = time.perf_counter()
+        try:
+            self.warmup_fn(model)
+        except Exception as e:
+            self.state = WARMUP_FAILED
+            self.error = f"warmup failed: {e}"
+            raise
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        self.state = READY
+        self.error = None
+        self.warmed = True
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "warmed": self.warmed,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """
+    Named models that load on first use instead of at import time, so the
+    process starts fast and only pays for the models it actually serves.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[Any], None]] = None) -> ModelEntry:
+        entry = ModelEntry(name, loader, warmup)
+        self._entries[name] = entry
+        return entry
+
+    def get(self, name: str) -> Any:
+        return self._entries[name].get()
+
+    def names(self):
+        return list(self._entries)
+
+    def status(self) -> Dict[str, dict]:
+        return {name: entry.status() for name, entry in self._entries.items()}
+
+    async def warmup(self, names: Iterable[str]):
+        """Load and warm each model in turn on a worker thread; failures are recorded, not raised."""
+        loop = asyncio.get_running_loop()
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is None:
+                logging.warning(f"Unknown model in warmup list: {name}")
+                continue
+            try:
+                await loop.run_in_executor(None, entry.warm)
+            except Exception as e:
+                logging.warning(f"Warmup of model {name} failed: {e}")
+
+    def ready(self, names: Iterable[str]) -> bool:
+        return all(name in self._entries and self._entries[name].warmed for name in names)
+
+
+registry = ModelRegistry()
+
+
+def _model_samples():
+    for name, entry in registry.status().items():
+        yield {"model": name, "phase": "load"}, entry["load_seconds"]
+        yield {"model": name, "phase": "warmup"}, entry["warmup_seconds"]
+
+
+MODEL_SECONDS = Gauge(
+    "mockint_model_load_seconds", "Seconds the last model load or warmup took.", ["model", "phase"], fn=_model_samples
+)
+MODEL_READY = Gauge(
+    "mockint_model_ready", "1 once a model is loaded and warmed; `state` shows why it is not (e.g. warmup_failed).",
+    ["model", "state"],
+    fn=lambda: [({"model": name, "state": entry["state"]}, 1.0 if entry["warmed"] else 0.0)
+                for name, entry in registry.status().items()],
+)
@@ -0,0 +1,113 @@
+from typing import List
+
+try:
+    from pocketsphinx import Decoder, Endpointer
+except Exception:
+    Decoder = None
+    Endpointer = None
+
+
+class StreamingRecognizer:
+    """
+    Incremental PocketSphinx recognizer for one audio stream.
+
+    Raw 16 kHz mono s16le PCM is pushed in arbitrarily sized chunks. An
+    endpointer splits the stream into utterances and the decoder keeps its
+    search state across chunks, so words spanning chunk boundaries are decoded
+    as one utterance and the acoustic model is loaded once per stream instead
+    of once per clip.
+
+    `accept()` returns transcript events:
+        {"type": "partial", "text": ..., "start": 1.23, "end": 2.50}
+        {"type": "final", "text": ..., "start": 1.23, "end": 3.10}
+    with times in seconds from the start of the stream.
+    """
+
+    def __init__(self):
+        if Decoder is None or Endpointer is None:
+            raise RuntimeError("pocketsphinx is not installed. Please add 'pocketsphinx' to requirements.txt")
+        self._ep = Endpointer()
+        self._decoder = Decoder(samprate=self._ep.sample_rate)
+        self.sample_rate = self._ep.sample_rate
+        self._frame_bytes = self._ep.frame_bytes
+        self._buffer = bytearray()
+        self._samples = 0
+        self._last_partial = None
+
+    @property
+    def position(self) -> float:
+        return self._samples / self.sample_rate
+
+    def accept(self, pcm: bytes) -> List[dict]:
+        events = []
+        self._buffer.extend(pcm)
+        while len(self._buffer) >= self._frame_bytes:
+            frame = bytes(self._buffer[:self._frame_bytes])
+            del self._buffer[:self._frame_bytes]
+            self._samples += self._frame_bytes // 2
+            self._process_frame(frame, events)
+        return events
+
+    def _process_frame(self, frame: bytes, events: List[dict]):
+        prev_in_speech = self._ep.in_speech
+        speech = self._ep.process(frame)
+        if speech is None:
+            return
+        if not prev_in_speech:
+            self._decoder.start_utt()
+            self._last_partial = None
+        self._decoder.process_raw(speech)
+        if self._ep.in_speech:
+            hyp = self._decoder.hyp()
+            if hyp is not None and hyp.hypstr and hyp.hypstr != self._last_partial:
+                self._last_partial = hyp.hypstr
+                events.append({
+                    "type": "partial",
+                    "text": hyp.hypstr,
+                    "start": round(self._ep.speech_start, 2),
+                    "end": round(self.position, 2),
+                })
+        else:
+            events.append(self._end_utterance(self._ep.speech_end))
+
+    def _words(self, offset: float) -> List[dict]:
+        # Word segments are in decoder frames (100 per second) from utterance start
+        words = []
+        for seg in self._decoder.seg():
+            word = seg.word
+            if word.startswith("<") or word.startswith("["):
+                continue
+            words.append({
+                "word": word.split("(")[0],
+                "start": round(offset + seg.start_frame / 100.0, 2),
+                "end": round(offset + seg.end_frame / 100.0, 2),
+            })
+        return words
+
+    def _end_utterance(self, end: float) -> dict:
+        self._decoder.end_utt()
+        hyp = self._decoder.hyp()
+        self._last_partial = None
+        start = self._ep.speech_start
+        try:
+            words = self._words(start)
+        except Exception:
+            words = []
+        return {
+            "type": "final",
+            "text": hyp.hypstr if hyp is not None else "",
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "words": words,
+        }
+
+    def flush(self) -> List[dict]:
+        """Close the stream, finalizing any utterance still in progress."""
+        events = []
+        if self._ep.in_speech:
+            speech = self._ep.end_stream(bytes(self._buffer))
+            self._buffer.clear()
+            if speech is not None:
+                self._decoder.process_raw(speech)
+            events.append(self._end_utterance(self.position))
+        return events
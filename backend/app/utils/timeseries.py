@@ -0,0 +1,106 @@
+import base64
+import math
+import zlib
+from typing import List, Optional
+import numpy as np
+
+ENCODING = "f16-zlib"
+
+
+class ConfidenceSeries:
+    """
+    Confidence samples (0-100) resampled onto a fixed period grid as they
+    arrive. A sample covering (start, end] on the running clock appends its
+    value once per grid boundary k * period in that interval, i.e.
+    floor(end / period) - floor(start / period) slots; a slot takes the value
+    of the sample in progress when it closes. Irregular frame timing thus
+    becomes a regular series.
+    """
+
+    def __init__(self, period: float = 1.0):
+        self.period = period
+        self.values: List[float] = []
+        self._elapsed = 0.0
+
+    def append(self, value: float, duration: float):
+        if duration <= 0:
+            return
+        start = self._elapsed
+        self._elapsed += duration
+        slots = math.floor(self._elapsed / self.period) - math.floor(start / self.period)
+        if slots > 0:
+            self.values.extend([float(value)] * slots)
+
+    def extend(self, values: np.ndarray, durations: np.ndarray):
+        """Vectorized bulk append, e.g. for a client-supplied confidence_data array."""
+        durations = np.clip(np.asarray(durations, dtype=np.float64), 0.0, None)
+        ends = self._elapsed + np.cumsum(durations)
+        starts = ends - durations
+        slots = np.floor(ends / self.period) - np.floor(starts / self.period)
+        if ends.size:
+            self._elapsed = float(ends[-1])
+        self.values.extend(np.repeat(np.asarray(values, dtype=np.float64), slots.astype(np.int64)).tolist())
+
+    def encode(self) -> dict:
+        return encode_series(np.asarray(self.values, dtype=np.float32), self.period)
+
+    @classmethod
+    def decode(cls, blob: Optional[dict], period: float = 1.0) -> "ConfidenceSeries":
+        """Continue a stored series, resampled onto `period` if it was stored at another one."""
+        series = cls(period)
+        if blob:
+            values = decode_series(blob)
+            series.extend(values, np.full(values.size, float(blob["period"])))
+        return series
+
+
+def encode_series(values: np.ndarray, period: float) -> dict:
+    """
+    Pack a fixed-period series as a zlib-compressed little-endian float16
+    blob (base64 so it fits a JSON column). An hour at 1 s is at most ~7 KB.
+    """
+    raw = np.asarray(values, dtype="<f2").tobytes()
+    return {
+        "encoding": ENCODING,
+        "period": period,
+        "count": int(len(values)),
+        "data": base64.b64encode(zlib.compress(raw, 6)).decode("ascii"),
+    }
+
+
+def decode_series(blob: dict) -> np.ndarray:
+    if not blob:
+        return np.zeros(0, dtype=np.float32)
+    if blob.get("encoding") != ENCODING:
+        raise ValueError(f"Unsupported series encoding: {blob.get('encoding')}")
+    raw = zlib.decompress(base64.b64decode(blob["data"]))
+    return np.frombuffer(raw, dtype="<f2").astype(np.float32)
+
+
+def downsample(values: np.ndarray, period: float, resolution: Optional[float] = None,
+               points: Optional[int] = None) -> dict:
+    """
+    Min/max/mean per window, computed in one reshape. The window is
+    `resolution` seconds, or sized so the result has at most `points` windows.
+    """
+    # Reduce in float64: stored series are float16/32 and their rounding would show up in the JSON
+    values = np.asarray(values, dtype=np.float64)
+    n = values.size
+    if n == 0:
+        return {"window": period, "count": 0, "t": [], "min": [], "max": [], "mean": []}
+    if points:
+        k = max(1, math.ceil(n / points))
+    else:
+        k = max(1, round((resolution or period) / period))
+    pad = (-n) % k
+    if pad:
+        values = np.concatenate([values, np.full(pad, np.nan, dtype=values.dtype)])
+    windows = values.reshape(-1, k)
+    return {
+        "window": k * period,
+        "count": int(windows.shape[0]),
+        "t": (np.arange(windows.shape[0]) * k * period).round(3).tolist(),
+        "min": np.nanmin(windows, axis=1).round(2).tolist(),
+        "max": np.nanmax(windows, axis=1).round(2).tolist(),
+        "mean": np.nanmean(windows, axis=1).round(2).tolist(),
+    }
@@ -0,0 +1,71 @@
+import json
+from fastapi import HTTPException, UploadFile
+from app.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit")
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytearray:
+    """
+    Read an uploaded file in chunks, failing with 413 as soon as it exceeds
+    `max_bytes`. Returns the bytearray itself (no final `bytes` copy); numpy,
+    OpenCV and the audio decoders all accept it as a buffer.
+    """
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise _too_large(max_bytes)
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            return buffer
+        if len(buffer) + len(chunk) > max_bytes:
+            raise _too_large(max_bytes)
+        buffer += chunk
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware that caps every HTTP request body at `max_bytes` before
+    it is parsed: an oversized Content-Length is refused up front, and a
+    chunked body is cut off with 413 once it passes the limit.
+    """
+
+    def __init__(self, app, max_bytes: int = settings.MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                await self._reject(send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": f"Request body exceeds the {self.max_bytes} byte limit"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,128 @@
+from datetime import datetime
+from typing import Optional
+from app.utils.fillers import tokenize
+
+STATS_VERSION = 1
+
+# Interview columns a rollup contribution is computed from
+ROLLUP_COLUMNS = [
+    "id", "job_role", "level", "confidence", "timestamp", "answers", "answer",
+    "filler_words", "confidence_stats",
+]
+
+
+def empty_stats() -> dict:
+    return {
+        "version": STATS_VERSION,
+        "interviews": 0,
+        "confidence": {"weight": 0.0, "sum": 0.0},
+        "words": 0,
+        "fillers": {},
+        "by_job_role": {},
+        "by_level": {},
+        "weekly": {},
+    }
+
+
+def _week(timestamp) -> Optional[str]:
+    if not timestamp:
+        return None
+    try:
+        when = timestamp if isinstance(timestamp, datetime) else datetime.fromisoformat(str(timestamp))
+    except ValueError:
+        return None
+    year, week, _ = when.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _confidence_weight(row: dict) -> float:
+    """Seconds of measured confidence behind the row's mean, or 1 when unknown."""
+    stats = (row.get("confidence_stats") or {}).get("confidence") or {}
+    duration = stats.get("duration")
+    return float(duration) if duration else 1.0
+
+
+def contribution(row: Optional[dict]) -> Optional[dict]:
+    """What one interview row adds to its user's rollup."""
+    if not row:
+        return None
+    answers = row.get("answers")
+    text = " ".join(answers) if isinstance(answers, list) else ""
+    if row.get("answer"):
+        text = f"{text} {row['answer']}"
+    confidence = row.get("confidence")
+    weight = _confidence_weight(row) if confidence is not None else 0.0
+    return {
+        "job_role": row.get("job_role") or "Interview",
+        "level": row.get("level") or "unknown",
+        "week": _week(row.get("timestamp")),
+        "weight": weight,
+        "sum": float(confidence) * weight if confidence is not None else 0.0,
+        "words": len(tokenize(text)) if text.strip() else 0,
+        "fillers": {w: int(c) for w, c in (row.get("filler_words") or {}).items()},
+    }
+
+
+def _apply_bucket(bucket: dict, contrib: dict, sign: int):
+    bucket["count"] = bucket.get("count", 0) + sign
+    bucket["weight"] = bucket.get("weight", 0.0) + sign * contrib["weight"]
+    bucket["sum"] = bucket.get("sum", 0.0) + sign * contrib["sum"]
+
+
+def apply(stats: dict, contrib: Optional[dict], sign: int = 1) -> dict:
+    """Add (sign=1) or remove (sign=-1) one interview's contribution in place."""
+    if contrib is None:
+        return stats
+    stats["interviews"] += sign
+    stats["confidence"]["weight"] += sign * contrib["weight"]
+    stats["confidence"]["sum"] += sign * contrib["sum"]
+    stats["words"] += sign * contrib["words"]
+    for word, count in contrib["fillers"].items():
+        stats["fillers"][word] = stats["fillers"].get(word, 0) + sign * count
+    filler_total = sum(contrib["fillers"].values())
+
+    groups = [(stats["by_job_role"], contrib["job_role"]), (stats["by_level"], contrib["level"])]
+    if contrib["week"]:
+        groups.append((stats["weekly"], contrib["week"]))
+    for group, key in groups:
+        bucket = group.setdefault(key, {})
+        _apply_bucket(bucket, contrib, sign)
+        if group is stats["weekly"]:
+            bucket["words"] = bucket.get("words", 0) + sign * contrib["words"]
+            bucket["fillers"] = bucket.get("fillers", 0) + sign * filler_total
+        if bucket["count"] <= 0:
+            del group[key]
+    stats["fillers"] = {w: c for w, c in stats["fillers"].items() if c > 0}
+    return stats
+
+
+def _mean(bucket: dict) -> Optional[float]:
+    return round(bucket["sum"] / bucket["weight"], 2) if bucket.get("weight", 0) > 1e-9 else None
+
+
+def _rate(fillers: int, words: int) -> float:
+    return round(100.0 * fillers / words, 2) if words else 0.0
+
+
+def summarize(stats: dict) -> dict:
+    """Response form of a stored rollup: means and rates instead of raw sums."""
+    filler_total = sum(stats["fillers"].values())
+    return {
+        "interviews": stats["interviews"],
+        "average_confidence": _mean(stats["confidence"]),
+        "words": stats["words"],
+        "filler_total": filler_total,
+        "filler_rate_per_100_words": _rate(filler_total, stats["words"]),
+        "fillers": dict(sorted(stats["fillers"].items(), key=lambda kv: -kv[1])),
+        "by_job_role": {k: {"count": b["count"], "average_confidence": _mean(b)} for k, b in stats["by_job_role"].items()},
+        "by_level": {k: {"count": b["count"], "average_confidence": _mean(b)} for k, b in stats["by_level"].items()},
+        "weekly": [
+            {
+                "week": week,
+                "count": b["count"],
+                "average_confidence": _mean(b),
+                "filler_rate_per_100_words": _rate(b.get("fillers", 0), b.get("words", 0)),
+            }
+            for week, b in sorted(stats["weekly"].items())
+        ],
+    }
@@ -0,0 +1,126 @@
+import io
+import subprocess
+from typing import List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.utils.audio import ffmpeg_binary
+from app.utils.image import decode_image
+
+Frame = Tuple[float, np.ndarray]
+
+
+class FrameSampler:
+    """
+    Picks frames from a timestamped sequence on a 1/fps grid: a frame is kept
+    once its time reaches the next grid point. A gap in the source longer
+    than one step restarts the grid at the first frame after the gap.
+    """
+
+    def __init__(self, fps: float):
+        self.step = 1.0 / fps
+        self.next_t: Optional[float] = None
+
+    def keep(self, t: float) -> bool:
+        if self.next_t is not None and t < self.next_t - 1e-6:
+            return False
+        if self.next_t is None or t >= self.next_t + self.step:
+            self.next_t = t + self.step
+        else:
+            self.next_t += self.step
+        return True
+
+
+def sample_indices(times: List[float], fps: float) -> List[int]:
+    """Indices of the frames kept when sampling `times` (seconds) at `fps`."""
+    sampler = FrameSampler(fps)
+    return [i for i, t in enumerate(times) if sampler.keep(t)]
+
+
+def _reduction(width: int, height: int, min_side: int) -> int:
+    factor = 1
+    while min_side and min(width, height) // (factor * 2) >= min_side:
+        factor *= 2
+    return factor
+
+
+def _decode_with_av(data, fps: float, max_frames: int, min_side: int) -> List[Frame]:
+    # PyAV decodes in-process; frames are scaled down by libswscale while converting to BGR
+    import av
+    frames: List[Frame] = []
+    sampler = FrameSampler(fps)
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        for frame in container.decode(stream):
+            if frame.time is None or not sampler.keep(float(frame.time)):
+                continue
+            t = float(frame.time)
+            factor = _reduction(frame.width, frame.height, min_side)
+            img = frame.to_ndarray(width=frame.width // factor, height=frame.height // factor, format="bgr24")
+            frames.append((t, img))
+            if len(frames) >= max_frames:
+                break
+    return frames
+
+
+def _split_jpegs(stream: bytes) -> List[bytes]:
+    images, start = [], 0
+    while True:
+        begin = stream.find(b"\xff\xd8", start)
+        if begin < 0:
+            return images
+        end = stream.find(b"\xff\xd9", begin + 2)
+        if end < 0:
+            return images
+        images.append(stream[begin:end + 2])
+        start = end + 2
+
+
+def _decode_with_ffmpeg(data, fps: float, max_frames: int, min_side: int) -> List[Frame]:
+    # ffmpeg resamples to the target rate and emits MJPEG, which decode_image scales on decode
+    proc = subprocess.run(
+        [
+            ffmpeg_binary(),
+            "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-an",
+            "-vf", f"fps={fps}",
+            "-frames:v", str(max_frames),
+            "-f", "image2pipe",
+            "-c:v", "mjpeg",
+            "-q:v", "3",
+            "pipe:1",
+        ],
+        input=bytes(data),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise RuntimeError(f"ffmpeg video decode failed: {proc.stderr.decode(errors='ignore').strip()[:200]}")
+    return [(i / fps, decode_image(jpeg, min_side)) for i, jpeg in enumerate(_split_jpegs(proc.stdout))]
+
+
+def decode_clip(data, fps: float, max_frames: int = settings.CLIP_MAX_FRAMES,
+                min_side: Optional[int] = None) -> List[Frame]:
+    """
+    Decode a short video clip (webm/mp4/...) into at most `max_frames` BGR
+    frames sampled at `fps`, as (seconds from start, image) pairs. Frames are
+    scaled down by powers of two while their shorter side stays at least
+    `min_side` (EMOTION_DECODE_MIN_SIDE by default).
+    """
+    if not data:
+        raise ValueError("Empty video payload")
+    if min_side is None:
+        min_side = settings.EMOTION_DECODE_MIN_SIDE
+    try:
+        try:
+            frames = _decode_with_av(data, fps, max_frames, min_side)
+        except ImportError:
+            frames = _decode_with_ffmpeg(data, fps, max_frames, min_side)
+    except Exception as e:
+        raise ValueError(f"Could not decode video: {e}")
+    if not frames:
+        raise ValueError("No video frames decoded")
+    start = frames[0][0]
+    return [(round(t - start, 3), img) for t, img in frames]
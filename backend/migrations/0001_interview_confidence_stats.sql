@@ -0,0 +1,3 @@
+-- Running confidence statistics and per-emotion dwell time written once by
+-- the server-side interview session (POST /interview/{id}/finish or idle flush).
+alter table interviews add column if not exists confidence_stats jsonb;
@@ -0,0 +1,3 @@
+-- Fixed-period confidence series stored as a zlib-compressed float16 blob
+-- ({"encoding": "f16-zlib", "period": 1.0, "count": n, "data": "<base64>"}).
+alter table interviews add column if not exists confidence_series jsonb;
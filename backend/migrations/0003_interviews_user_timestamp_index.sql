@@ -0,0 +1,3 @@
+-- Serves GET /interview/ keyset pages: user_id = ? order by timestamp desc, id desc
+create index if not exists interviews_user_timestamp_id_idx
+    on interviews (user_id, timestamp desc, id desc);
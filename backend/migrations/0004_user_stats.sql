@@ -0,0 +1,8 @@
+-- Per-user progress rollups, maintained incrementally on every interview write
+-- and served by GET /interview/stats. Rows are rebuilt from interviews on demand,
+-- so the table can be truncated safely.
+create table if not exists user_stats (
+    user_id uuid primary key,
+    stats jsonb not null,
+    updated_at timestamptz not null default now()
+);
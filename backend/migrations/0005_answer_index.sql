@@ -0,0 +1,27 @@
+-- Inverted index over interview answers and transcripts, maintained on every
+-- interview write and served by /answers/search, /answers/terms and
+-- /answers/fillers/top. One row per (interview, field, term); `kind` is
+-- 'word' or 'filler' and `positions` are token offsets within the field.
+create table if not exists answer_terms (
+    user_id uuid not null,
+    interview_id uuid not null,
+    kind text not null,
+    term text not null,
+    field text not null,
+    positions integer[] not null,
+    count integer not null,
+    timestamp timestamptz,
+    primary key (interview_id, kind, term, field)
+);
+
+-- Lookups are always one user's postings for a few terms, newest first
+create index if not exists answer_terms_user_kind_term_timestamp_idx
+    on answer_terms (user_id, kind, term, timestamp desc);
+
+-- Users whose postings are complete; rows are rebuilt from interviews on the
+-- next search when missing, so both tables can be truncated safely.
+create table if not exists answer_index (
+    user_id uuid primary key,
+    version integer not null,
+    built_at timestamptz not null default now()
+);
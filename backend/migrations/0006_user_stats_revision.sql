@@ -0,0 +1,4 @@
+-- Rollup revision for compare-and-swap updates: a worker only stores its
+-- updated rollup if the revision it read is still current, so concurrent
+-- interview writes from several API workers cannot overwrite each other.
+alter table user_stats add column if not exists revision bigint not null default 0;
@@ -0,0 +1,3 @@
+-- Tenant of each user, selecting their filler-word lexicon from
+-- FILLER_LEXICON_FILE (or register_lexicon). Null uses the default lexicon.
+alter table users add column if not exists tenant_id text;
@@ -0,0 +1,360 @@
+"""
+End-to-end benchmark for the backend, run in-process against an in-memory
+Supabase stand-in so it needs no network or database.
+
+Scenarios:
+    emotion    POST /detect_emotion with synthetic webcam JPEGs
+    voice      POST /transcribe_voice/ with synthetic speech-like WAV clips
+    interview  start -> list -> patch -> stats -> save on the /interview routes
+
+Usage (from backend/):
+    python scripts/benchmark.py --scenarios emotion,voice,interview --concurrency 8 --requests 200 \
+        --output bench.json [--baseline previous.json --max-regression 0.15]
+
+Each scenario reports p50/p95/p99/mean/max latency and throughput per route,
+plus process CPU time (own and child processes such as decoder workers and
+ffmpeg) and memory. Results are written as JSON; with --baseline, p95 latency
+and throughput are compared per route and the exit code is 1 when any route
+regresses by more than --max-regression.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import wave
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import cv2
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from supabase_standin import SupabaseStandIn  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+# --- synthetic inputs -------------------------------------------------------
+
+def synthetic_frames(count: int, width: int, height: int, seed: int = 0) -> List[bytes]:
+    """
+    Webcam-like JPEGs: a lit background with a face-shaped ellipse, eyes and a
+    mouth, drifting slightly and with sensor noise so consecutive frames differ.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        img = np.full((height, width, 3), (90, 110, 130), dtype=np.uint8)
+        cx = width // 2 + int(6 * np.sin(i / 5))
+        cy = height // 2 + int(4 * np.cos(i / 7))
+        rx, ry = width // 8, height // 5
+        cv2.ellipse(img, (cx, cy), (rx, ry), 0, 0, 360, (150, 180, 215), -1)
+        for dx in (-rx // 2, rx // 2):
+            cv2.circle(img, (cx + dx, cy - ry // 4), max(2, rx // 8), (40, 40, 40), -1)
+        smile = int(ry // 4 * (0.5 + 0.5 * np.sin(i / 3)))
+        cv2.ellipse(img, (cx, cy + ry // 3), (rx // 2, max(1, smile)), 0, 0, 180, (60, 50, 120), 3)
+        noise = rng.integers(-12, 13, img.shape, dtype=np.int16)
+        img = np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        frames.append(buf.tobytes())
+    return frames
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    Speech-like int16 PCM: voiced syllables (a gliding fundamental with
+    harmonics shaped by two formant peaks) at ~4 Hz, with short pauses.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 120 + 30 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    formants = [(rng.uniform(500, 800), 1.0), (rng.uniform(1100, 1800), 0.5)]
+    voice = np.zeros_like(t)
+    for k in range(1, 25):
+        gain = sum(w / (1 + ((k * f0 - f) / 150) ** 2) for f, w in formants)
+        voice += gain * np.sin(k * phase) / k
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    pauses = (np.sin(2 * np.pi * 0.4 * t + rng.uniform(0, np.pi)) > -0.6).astype(float)
+    signal = voice * syllables * pauses + 0.01 * rng.standard_normal(t.size)
+    signal /= np.abs(signal).max() + 1e-9
+    return (signal * 0.6 * 32767).astype(np.int16)
+
+
+def wav_bytes(pcm: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+# --- measurement ------------------------------------------------------------
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except Exception:
+        return 0.0
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def latency_stats(samples: List[float], errors: int, wall: float) -> dict:
+    values = np.array(samples) * 1000 if samples else np.zeros(0)
+    stats = {"requests": len(samples) + errors, "errors": errors,
+             "throughput_rps": round(len(samples) / wall, 2) if wall else 0.0}
+    if values.size:
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        stats.update({
+            "p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2),
+            "mean_ms": round(float(values.mean()), 2), "max_ms": round(float(values.max()), 2),
+        })
+    return stats
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_examples: Dict[str, str] = {}
+
+    async def call(self, label: str, request: Callable, ok: Callable[[httpx.Response], bool] = None):
+        started = time.perf_counter()
+        try:
+            response = await request()
+            good = response.status_code < 400 and (ok is None or ok(response))
+        except Exception as e:
+            response, good = None, False
+            self.error_examples.setdefault(label, repr(e))
+        elapsed = time.perf_counter() - started
+        if good:
+            self.samples.setdefault(label, []).append(elapsed)
+        else:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            if response is not None:
+                self.error_examples.setdefault(label, f"{response.status_code}: {response.text[:200]}")
+        return response
+
+
+async def run_scenario(name: str, worker: Callable, requests: int, concurrency: int) -> dict:
+    recorder = Recorder()
+    counter = iter(range(requests))
+
+    async def loop():
+        for i in counter:
+            await worker(recorder, i)
+
+    cpu_before, children_before = _cpu_seconds()
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*(loop() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    cpu_after, children_after = _cpu_seconds()
+
+    labels = sorted(set(recorder.samples) | set(recorder.errors))
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "cpu": {
+            "process_s": round(cpu_after - cpu_before, 3),
+            "children_s": round(children_after - children_before, 3),
+            "utilization": round((cpu_after - cpu_before) / wall, 3) if wall else 0.0,
+        },
+        "memory": {
+            "rss_before_mb": round(rss_before, 1),
+            "rss_after_mb": round(_rss_mb(), 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "routes": {label: latency_stats(recorder.samples.get(label, []), recorder.errors.get(label, 0), wall)
+                   for label in labels},
+    }
+    if recorder.error_examples:
+        result["error_examples"] = recorder.error_examples
+    print(f"[{name}] {requests} iterations in {wall:.2f}s")
+    for label, stats in result["routes"].items():
+        print(f"  {label:<28} p50 {stats.get('p50_ms', '-'):>8} p95 {stats.get('p95_ms', '-'):>8} "
+              f"p99 {stats.get('p99_ms', '-'):>8} ms  {stats['throughput_rps']:>7} req/s  errors {stats['errors']}")
+    return result
+
+
+# --- scenarios --------------------------------------------------------------
+
+def emotion_worker(client: httpx.AsyncClient, headers: List[dict], frames: List[bytes]):
+    async def work(recorder: Recorder, i: int):
+        frame = frames[i % len(frames)]
+        user_headers = headers[i % len(headers)]
+        await recorder.call(
+            "POST /detect_emotion",
+            lambda: client.post("/detect_emotion", files={"file": ("frame.jpg", frame, "image/jpeg")}, headers=user_headers),
+            ok=lambda r: "error" not in r.json() and r.json()["emotion"].get("emotion") != "error",
+        )
+    return work
+
+
+def voice_worker(client: httpx.AsyncClient, headers: List[dict], clips: List[bytes]):
+    async def work(recorder: Recorder, i: int):
+        clip = clips[i % len(clips)]
+        user_headers = headers[i % len(headers)]
+        await recorder.call(
+            "POST /transcribe_voice/",
+            lambda: client.post("/transcribe_voice/", files={"file": ("clip.wav", clip, "audio/wav")}, headers=user_headers),
+        )
+    return work
+
+
+def interview_worker(client: httpx.AsyncClient, headers: List[dict]):
+    async def work(recorder: Recorder, i: int):
+        user_headers = headers[i % len(headers)]
+        started = await recorder.call("POST /interview/start", lambda: client.post(
+            "/interview/start", json={"job_role": "Software Engineer", "interview_name": f"bench {i}", "level": "Beginner"},
+            headers=user_headers))
+        await recorder.call("GET /interview/ (summary)", lambda: client.get(
+            "/interview/", params={"view": "summary", "limit": 20}, headers=user_headers))
+        if started is not None and started.status_code < 400:
+            interview_id = started.json()["id"]
+            await recorder.call("PATCH /interview/{id}", lambda: client.patch(
+                f"/interview/{interview_id}",
+                json={"confidence": 70 + i % 30, "answer": "um I think so", "filler_words": {"um": 1}},
+                headers=user_headers))
+        await recorder.call("GET /interview/stats", lambda: client.get("/interview/stats", headers=user_headers))
+        await recorder.call("POST /interview/", lambda: client.post("/interview/", json={
+            "job_role": "Data Scientist",
+            "level": "Intermediate",
+            "confidence_data": [{"confidence": 60 + (i + k) % 40, "duration": 2.0} for k in range(30)],
+            "answers": ["So basically I would start with the data.", "Um, then a baseline model."],
+            "timestamp": datetime.now().isoformat(),
+        }, headers=user_headers))
+    return work
+
+
+# --- baseline comparison ----------------------------------------------------
+
+def compare(current: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Routes whose p95 latency rose or throughput fell by more than `max_regression` (a fraction)."""
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        base_routes = baseline.get("scenarios", {}).get(scenario, {}).get("routes", {})
+        for label, stats in result["routes"].items():
+            base = base_routes.get(label)
+            if not base or "p95_ms" not in base or "p95_ms" not in stats:
+                continue
+            p95_change = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+            rps_change = (stats["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"] if base["throughput_rps"] else 0.0
+            flag = p95_change > max_regression or rps_change < -max_regression
+            print(f"  {scenario}/{label:<28} p95 {base['p95_ms']:>8} -> {stats['p95_ms']:>8} ms ({p95_change:+.1%})  "
+                  f"rps {base['throughput_rps']:>7} -> {stats['throughput_rps']:>7} ({rps_change:+.1%})"
+                  f"{'  REGRESSION' if flag else ''}")
+            if flag:
+                regressions.append(f"{scenario}/{label}")
+    return regressions
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+async def main(args) -> int:
+    from app.data_access import db
+
+    standin = SupabaseStandIn()
+    # One user per concurrent worker, so per-user admission limits do not throttle the run
+    users = [standin.add_user(f"bench{k}@example.com", f"bench{k}") for k in range(max(1, args.concurrency))]
+    db.configure(url="http://supabase-standin", key="standin", transport=standin.transport)
+
+    from app.config import settings
+    from app.main import app
+
+    headers = [{"Authorization": f"Bearer token_{user['id']}"} for user in users]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    results = {}
+    async with app.router.lifespan_context(app):
+        if args.wait_ready:
+            from app.utils.model_registry import registry
+            while not registry.ready(settings.MODEL_WARMUP):
+                await asyncio.sleep(0.2)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for name in scenarios:
+                if name == "emotion":
+                    frames = synthetic_frames(args.frames, args.width, args.height)
+                    worker = emotion_worker(client, headers, frames)
+                elif name == "voice":
+                    clips = [wav_bytes(synthetic_speech(args.clip_seconds, seed=k)) for k in range(4)]
+                    worker = voice_worker(client, headers, clips)
+                elif name == "interview":
+                    worker = interview_worker(client, headers)
+                else:
+                    raise SystemExit(f"Unknown scenario: {name}")
+                results[name] = await run_scenario(name, worker, args.requests, args.concurrency)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "emotion_backend": settings.EMOTION_BACKEND,
+            "asr_backend": settings.ASR_BACKEND,
+            "args": vars(args),
+            "supabase_requests": standin.requests,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} (commit {baseline.get('meta', {}).get('commit')}):")
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} route(s) regressed by more than {args.max_regression:.0%}")
+            return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="emotion,voice,interview")
+    parser.add_argument("--requests", type=int, default=100, help="iterations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=32, help="distinct synthetic frames")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--clip-seconds", type=float, default=4.0)
+    parser.add_argument("--wait-ready", action="store_true", help="wait for model warmup before measuring")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,140 @@
+"""
+In-process stand-in for the Supabase REST (PostgREST) API, for running the
+backend offline in benchmarks and scripts.
+
+It implements the subset of PostgREST the data-access layer uses: select with
+column lists, eq/neq/lt/lte/gt/gte/is/in filters, the keyset `or=(...)` filter,
+order, limit/offset and exact counts, plus insert, upsert (on_conflict), update
+and delete. Tables live in memory as lists of dicts.
+
+    standin = SupabaseStandIn()
+    user = standin.add_user("bench@example.com")
+    db.configure(url="http://standin", key="standin", transport=standin.transport)
+"""
+
+import json
+import re
+import threading
+import uuid
+from typing import Dict, List, Optional
+import httpx
+
+_OR_KEYSET = re.compile(r'^\((\w+)\.(\w+)\."?([^",]*)"?,and\((\w+)\.eq\."?([^",]*)"?,(\w+)\.(\w+)\."?([^",)]*)"?\)\)$')
+_RESERVED = {"select", "order", "limit", "offset", "or", "on_conflict"}
+
+
+def _compare(value, op: str, operand: str) -> bool:
+    if op == "is":
+        return value is None if operand == "null" else str(value).lower() == operand
+    if op == "in":
+        return str(value) in operand.strip("()").split(",")
+    if value is None:
+        return False
+    left, right = str(value), operand
+    try:
+        left, right = float(left), float(right)
+    except ValueError:
+        pass
+    return {
+        "eq": left == right,
+        "neq": left != right,
+        "lt": left < right,
+        "lte": left <= right,
+        "gt": left > right,
+        "gte": left >= right,
+    }.get(op, False)
+
+
+class SupabaseStandIn:
+    def __init__(self):
+        self.tables: Dict[str, List[dict]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.transport = httpx.MockTransport(self.handle)
+
+    def add_user(self, email: str, username: Optional[str] = None) -> dict:
+        user = {"id": str(uuid.uuid4()), "email": email, "username": username or email.split("@")[0]}
+        self.tables.setdefault("users", []).append(user)
+        return user
+
+    def _filter(self, rows: List[dict], params: List[tuple]) -> List[dict]:
+        for column, expression in params:
+            if column in _RESERVED:
+                continue
+            op, _, operand = expression.partition(".")
+            rows = [r for r in rows if _compare(r.get(column), op, operand)]
+        keyset = dict(params).get("or")
+        if keyset:
+            match = _OR_KEYSET.match(keyset)
+            if match is None:
+                raise ValueError(f"Unsupported or filter: {keyset}")
+            col, op, val, _, eq_val, col2, op2, val2 = match.groups()
+            rows = [
+                r for r in rows
+                if _compare(r.get(col), op, val) or (_compare(r.get(col), "eq", eq_val) and _compare(r.get(col2), op2, val2))
+            ]
+        return rows
+
+    @staticmethod
+    def _order(rows: List[dict], order: Optional[str]) -> List[dict]:
+        for term in reversed((order or "").split(",")):
+            if not term:
+                continue
+            column, _, direction = term.partition(".")
+            rows = sorted(rows, key=lambda r: (r.get(column) is None, str(r.get(column))), reverse=direction == "desc")
+        return rows
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests += 1
+            table = request.url.path.rsplit("/", 1)[-1]
+            rows = self.tables.setdefault(table, [])
+            params = list(request.url.params.multi_items())
+            query = dict(params)
+            try:
+                if request.method == "GET":
+                    return self._select(rows, params, query, request)
+                body = json.loads(request.content) if request.content else None
+                if request.method == "POST":
+                    return self._insert(rows, body, query.get("on_conflict"))
+                matched = self._filter(rows, params)
+                if request.method == "PATCH":
+                    for row in matched:
+                        row.update(body)
+                    return httpx.Response(200, json=matched)
+                if request.method == "DELETE":
+                    for row in matched:
+                        rows.remove(row)
+                    return httpx.Response(200, json=matched)
+            except ValueError as e:
+                return httpx.Response(400, json={"message": str(e)})
+            return httpx.Response(405, json={"message": f"Unsupported method {request.method}"})
+
+    def _select(self, rows, params, query, request) -> httpx.Response:
+        matched = self._order(self._filter(rows, params), query.get("order"))
+        total = len(matched)
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+        matched = matched[offset:offset + limit if limit is not None else None]
+        columns = query.get("select", "*")
+        if columns != "*":
+            names = columns.split(",")
+            matched = [{c: r.get(c) for c in names} for r in matched]
+        headers = {}
+        if "count=exact" in request.headers.get("prefer", ""):
+            headers["content-range"] = f"0-{max(0, len(matched) - 1)}/{total}"
+        return httpx.Response(200, json=matched, headers=headers)
+
+    def _insert(self, rows, body, on_conflict: Optional[str]) -> httpx.Response:
+        created = []
+        for item in body if isinstance(body, list) else [body]:
+            existing = next((r for r in rows if on_conflict and r.get(on_conflict) == item.get(on_conflict)), None)
+            if existing is not None:
+                existing.update(item)
+                created.append(existing)
+                continue
+            row = dict(item)
+            row.setdefault("id", str(uuid.uuid4()))
+            rows.append(row)
+            created.append(row)
+        return httpx.Response(201, json=created)
@@ -1,11 +1,24 @@
 from fastapi.testclient import TestClient
-from app.main import app
 import io
+import os
+import sys
 import wave
 import json
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase_standin import SupabaseStandIn
+from app.data_access import db
+
 
 def main():
+    # Offline: point the data layer at the in-memory Supabase stand-in
+    standin = SupabaseStandIn()
+    user = standin.add_user("voice@example.com")
+    db.configure(url="http://supabase-standin", key="standin", transport=standin.transport)
+
+    from app.main import app
+
     # Create a 1-second mono 16kHz silence WAV in-memory
     buf = io.BytesIO()
     with wave.open(buf, 'wb') as wf:
@@ -15,19 +28,16 @@ def main():
         wf.writeframes(b"\x00\x00" * 16000)
     buf.seek(0)
 
-    client = TestClient(app)
-    files = { 'file': ('test.wav', buf, 'audio/wav') }
-    resp = client.post('/detect_voice_emotion/', files=files)
-    print('status', resp.status_code)
-    try:
-        print(json.dumps(resp.json()))
-    except Exception:
-        print(resp.text)
+    with TestClient(app) as client:
+        files = { 'file': ('test.wav', buf, 'audio/wav') }
+        headers = { 'Authorization': f"Bearer token_{user['id']}" }
+        resp = client.post('/transcribe_voice/', files=files, headers=headers)
+        print('status', resp.status_code)
+        try:
+            print(json.dumps(resp.json()))
+        except Exception:
+            print(resp.text)
 
 
 if __name__ == '__main__':
     main()
-
-
-
-
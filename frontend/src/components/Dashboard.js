@@ -10,6 +10,10 @@ const Dashboard = () => {
   const [interviews, setInterviews] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  // Full rows fetched on demand by "View Details", keyed by interview id
+  const [details, setDetails] = useState({});
 
   // Modal state
   const [showModal, setShowModal] = useState(false);
@@ -23,15 +27,17 @@ const Dashboard = () => {
     // Refetch whenever route changes back to dashboard (e.g., after End Interview)
   }, [location.key]);
 
+  const PAGE_SIZE = 20;
+
   const fetchInterviews = async () => {
     try {
       setIsLoading(true);
-      const response = await API.get('/interview/');
+      setError(null);
+      const response = await API.get('/interview/', { params: { view: 'summary', limit: PAGE_SIZE } });
       if (response.data.status === 'success') {
-        const sortedInterviews = response.data.interviews.sort((a, b) =>
-          new Date(b.timestamp) - new Date(a.timestamp)
-        );
-        setInterviews(sortedInterviews);
+        setInterviews(response.data.interviews);
+        setNextCursor(response.data.next_cursor || null);
+        setDetails({});
       } else {
         setError('Failed to fetch interviews');
       }
@@ -42,6 +48,41 @@ const Dashboard = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setIsLoadingMore(true);
+      const response = await API.get('/interview/', { params: { view: 'summary', limit: PAGE_SIZE, cursor: nextCursor } });
+      if (response.data.status === 'success') {
+        setInterviews((prev) => [...prev, ...response.data.interviews]);
+        setNextCursor(response.data.next_cursor || null);
+      }
+    } catch (error) {
+      setError('Failed to load more interviews');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const toggleDetails = async (interviewId) => {
+    if (details[interviewId]) {
+      setDetails((prev) => {
+        const next = { ...prev };
+        delete next[interviewId];
+        return next;
+      });
+      return;
+    }
+    try {
+      const response = await API.get(`/interview/${interviewId}`);
+      if (response.data.status === 'success') {
+        setDetails((prev) => ({ ...prev, [interviewId]: response.data.interview }));
+      }
+    } catch (error) {
+      console.error('Failed to load interview details:', error);
+    }
+  };
+
   const openModal = () => {
     setInterviewName('');
     setJobRole('');
@@ -126,7 +167,9 @@ const Dashboard = () => {
                 </div>
               ) : (
                 <div className="space-y-4">
-                  {interviews.map((interview, index) => (
+                  {interviews.map((summary, index) => {
+                    const interview = details[summary.id] || summary;
+                    return (
                     <div key={interview.id || index} className="bg-gray-800/50 border border-white/10 rounded-xl p-6 hover:bg-gray-800/70 transition-colors">
                       <div className="flex flex-col lg:flex-row lg:items-center lg:justify-between gap-4">
                         <div className="flex-1">
@@ -183,11 +226,19 @@ const Dashboard = () => {
                           )}
                         </div>
                         <div className="flex gap-2">
-                          <button onClick={() => console.log('View interview details:', interview)} className="px-4 py-2 text-sm bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors">View Details</button>
+                          <button onClick={() => toggleDetails(summary.id)} className="px-4 py-2 text-sm bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors">{details[summary.id] ? 'Hide Details' : 'View Details'}</button>
                         </div>
                       </div>
                     </div>
-                  ))}
+                    );
+                  })}
+                  {nextCursor && (
+                    <div className="flex justify-center pt-2">
+                      <button onClick={loadMore} disabled={isLoadingMore} className="px-4 py-2 text-sm bg-gray-700 text-white rounded-lg hover:bg-gray-600 transition-colors disabled:opacity-50">
+                        {isLoadingMore ? 'Loading...' : 'Load more'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
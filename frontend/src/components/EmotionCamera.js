@@ -14,12 +14,17 @@ const EmotionCamera = () => {
   const [confidence, setConfidence] = useState(0);
   const [confidenceData, setConfidenceData] = useState([]);
   const intervalRef = useRef(null);
+  const emotionSocketRef = useRef(null);
   const audioIntervalRef = useRef(null);
   const audioStreamRef = useRef(null);
+  const transcribeSocketRef = useRef(null);
+  const streamRecorderRef = useRef(null);
   const [voiceText, setVoiceText] = useState("Listening...");
   const [fullTranscript, setFullTranscript] = useState("");
   const [fillerCounts, setFillerCounts] = useState({});
   const [interviewId, setInterviewId] = useState(null);
+  const interviewIdRef = useRef(null);
+  const transcriptEndRef = useRef(null);
   const [questions, setQuestions] = useState(Array.isArray(initialQuestions) ? initialQuestions : []);
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
 
@@ -64,13 +69,71 @@ const EmotionCamera = () => {
     };
   }, []);
 
+  useEffect(() => {
+    // Stream frames over one WebSocket once the interview row exists
+    if (!interviewId) return undefined;
+    const token = localStorage.getItem('token');
+    const wsBase = API.defaults.baseURL.replace(/^http/, 'ws');
+    const socket = new WebSocket(`${wsBase}/ws/emotion/${interviewId}?token=${encodeURIComponent(token || '')}`);
+    socket.binaryType = 'arraybuffer';
+    socket.onmessage = (event) => {
+      try {
+        const data = JSON.parse(event.data);
+        if (data.type === 'emotion') applyEmotionResult(data.emotion);
+      } catch (err) {
+        console.error('Emotion stream parse error:', err);
+      }
+    };
+    socket.onerror = (err) => console.error('Emotion stream error:', err);
+    emotionSocketRef.current = socket;
+
+    return () => {
+      emotionSocketRef.current = null;
+      socket.close();
+    };
+  }, [interviewId]);
+
+  useEffect(() => {
+    // Stream microphone audio for incremental transcription once the interview row exists
+    if (!interviewId) return undefined;
+    const token = localStorage.getItem('token');
+    const wsBase = API.defaults.baseURL.replace(/^http/, 'ws');
+    const socket = new WebSocket(`${wsBase}/ws/transcribe/${interviewId}?format=webm&token=${encodeURIComponent(token || '')}`);
+    socket.onopen = () => startStreamingRecorder();
+    socket.onmessage = (event) => {
+      try {
+        const data = JSON.parse(event.data);
+        if (data.type === 'partial') {
+          setVoiceText(data.text);
+        } else if (data.type === 'final') {
+          applyTranscript(data.text, data.filler_words);
+        } else if (data.type === 'end' && transcriptEndRef.current) {
+          transcriptEndRef.current();
+        }
+      } catch (err) {
+        console.error('Transcription stream parse error:', err);
+      }
+    };
+    socket.onerror = (err) => console.error('Transcription stream error:', err);
+    transcribeSocketRef.current = socket;
+
+    return () => {
+      stopStreamingRecorder();
+      transcribeSocketRef.current = null;
+      socket.close();
+    };
+  }, [interviewId]);
+
   useEffect(() => {
     // Create interview row at start
     const start = async () => {
       try {
         const payload = { job_role: jobRole || 'Interview', interview_name: interviewName || undefined, level: level || undefined };
         const res = await API.post('/interview/start', payload);
-        if (res.data && res.data.id) setInterviewId(res.data.id);
+        if (res.data && res.data.id) {
+          interviewIdRef.current = res.data.id;
+          setInterviewId(res.data.id);
+        }
       } catch (e) {
         console.error('Failed to start interview row:', e);
       }
@@ -97,6 +160,18 @@ const EmotionCamera = () => {
     };
   }, []);
 
+  const applyEmotionResult = (result) => {
+    if (!result || result.emotion === 'error') return;
+    setEmotion(result.emotion);
+    const numericConfidence = Number((result.confidence * 100).toFixed(2));
+    setConfidence(numericConfidence);
+    // accumulate confidence data with fixed duration equal to interval period (2s)
+    setConfidenceData((prev) => [
+      ...prev,
+      { confidence: numericConfidence, duration: 2.0 },
+    ]);
+  };
+
   const captureAndSendFrame = async () => {
     const video = videoRef.current;
     const canvas = canvasRef.current;
@@ -107,37 +182,80 @@ const EmotionCamera = () => {
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
 
     canvas.toBlob(async (blob) => {
+      if (!blob) return;
+      const socket = emotionSocketRef.current;
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(blob);
+        return;
+      }
+
+      // Fall back to one HTTP request per frame until the stream is connected
       const formData = new FormData();
       formData.append("file", blob, "frame.jpg");
 
       try {
-        const response = await fetch("http://127.0.0.1:8000/detect_emotion", {
-          method: "POST",
-          body: formData,
-        });
-
-        const data = await response.json();
-        console.log("Received:", data);
-
-        setEmotion(data.emotion.emotion);
-        const numericConfidence = Number((data.emotion.confidence * 100).toFixed(2));
-        setConfidence(numericConfidence);
-        // accumulate confidence data with fixed duration equal to interval period (2s)
-        setConfidenceData((prev) => [
-          ...prev,
-          { confidence: numericConfidence, duration: 2.0 },
-        ]);
-
+        const params = interviewIdRef.current ? { interview_id: interviewIdRef.current } : undefined;
+        const { data } = await API.post('/detect_emotion', formData, { params });
+        applyEmotionResult(data.emotion);
       } catch (err) {
         console.error("Emotion detection error:", err);
       }
     }, "image/jpeg");
   };
 
+  const applyTranscript = (text, fillers) => {
+    setVoiceText(text);
+    setFullTranscript((prev) => {
+      const combined = (prev ? prev + ' ' : '') + text;
+      return combined.trim();
+    });
+    if (fillers && typeof fillers === 'object') {
+      setFillerCounts((prev) => {
+        const next = { ...prev };
+        Object.entries(fillers).forEach(([w, c]) => {
+          next[w] = (next[w] || 0) + (Number(c) || 0);
+        });
+        return next;
+      });
+    }
+  };
+
+  const startStreamingRecorder = () => {
+    const stream = audioStreamRef.current;
+    const socket = transcribeSocketRef.current;
+    if (!stream || !socket || socket.readyState !== WebSocket.OPEN || streamRecorderRef.current) return;
+    try {
+      const mimeType = MediaRecorder.isTypeSupported('audio/webm;codecs=opus')
+        ? 'audio/webm;codecs=opus' : 'audio/webm';
+      const recorder = new MediaRecorder(stream, { mimeType });
+      recorder.ondataavailable = (e) => {
+        if (e.data && e.data.size > 0 && socket.readyState === WebSocket.OPEN) socket.send(e.data);
+      };
+      recorder.start(250);
+      streamRecorderRef.current = recorder;
+    } catch (err) {
+      console.error('Failed to start streaming recorder:', err);
+    }
+  };
+
+  const stopStreamingRecorder = () => {
+    const recorder = streamRecorderRef.current;
+    streamRecorderRef.current = null;
+    if (recorder && recorder.state !== 'inactive') {
+      try { recorder.stop(); } catch {}
+    }
+  };
+
   const startOneShotAudioRecording = () => {
     try {
       const stream = audioStreamRef.current;
       if (!stream) return;
+      // Prefer the continuous transcription stream when it is connected
+      const socket = transcribeSocketRef.current;
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        startStreamingRecorder();
+        return;
+      }
 
       const mimeType = MediaRecorder.isTypeSupported('audio/webm;codecs=opus')
         ? 'audio/webm;codecs=opus' : 'audio/webm';
@@ -156,24 +274,11 @@ const EmotionCamera = () => {
           const formData = new FormData();
           formData.append('file', blob, 'clip.webm');
 
-          const { data } = await API.post('/transcribe_voice/', formData);
+          const params = interviewIdRef.current ? { interview_id: interviewIdRef.current } : undefined;
+          const { data } = await API.post('/transcribe_voice/', formData, { params });
           if (data && data.transcript) {
-            const text = data.transcript.text || '';
-            setVoiceText(text);
-            setFullTranscript((prev) => {
-              const combined = (prev ? prev + ' ' : '') + text;
-              return combined.trim();
-            });
-            const fillers = data.transcript.filler_words || {};
-            if (fillers && typeof fillers === 'object') {
-              setFillerCounts((prev) => {
-                const next = { ...prev };
-                Object.entries(fillers).forEach(([w, c]) => {
-                  next[w] = (next[w] || 0) + (Number(c) || 0);
-                });
-                return next;
-              });
-            }
+            // Silent clips come back with an empty transcript
+            if (data.transcript.text) applyTranscript(data.transcript.text, data.transcript.filler_words || {});
           } else if (data && data.detail) {
             setVoiceText('Error');
           }
@@ -204,25 +309,40 @@ const EmotionCamera = () => {
         const tracks = video.srcObject.getTracks();
         tracks.forEach((t) => t.stop());
       }
-      // stop mic stream
+      // flush the transcription stream (waiting briefly for its last segment), then stop mic stream
+      stopStreamingRecorder();
+      const transcribeSocket = transcribeSocketRef.current;
+      if (transcribeSocket && transcribeSocket.readyState === WebSocket.OPEN) {
+        const ended = new Promise((resolve) => {
+          transcriptEndRef.current = resolve;
+          setTimeout(resolve, 2000);
+        });
+        transcribeSocket.send('end');
+        await ended;
+      }
       if (audioStreamRef.current) {
         audioStreamRef.current.getTracks().forEach((t) => t.stop());
       }
 
-      // Prepare final PATCH payload
-      const finalPayload = {
-        answer: fullTranscript,
-        filler_words: fillerCounts,
-        confidence: (confidenceData && confidenceData.length)
-          ? confidenceData.reduce((acc, d) => acc + (d.confidence * d.duration), 0) /
-            confidenceData.reduce((acc, d) => acc + d.duration, 0)
-          : 0
-      };
+      if (!interviewId) {
+        console.warn('No interviewId found; skipping final save.');
+        return;
+      }
 
-      if (interviewId) {
+      try {
+        // The server has been aggregating confidence and transcript as the interview ran
+        await API.post(`/interview/${interviewId}/finish`);
+      } catch (finishErr) {
+        // No live session on the server (e.g. it restarted): send the client-side totals instead
+        const finalPayload = {
+          answer: fullTranscript,
+          filler_words: fillerCounts,
+          confidence: (confidenceData && confidenceData.length)
+            ? confidenceData.reduce((acc, d) => acc + (d.confidence * d.duration), 0) /
+              confidenceData.reduce((acc, d) => acc + d.duration, 0)
+            : 0
+        };
         await API.patch(`/interview/${interviewId}`, finalPayload);
-      } else {
-        console.warn('No interviewId found; skipping final save.');
       }
     } catch (err) {
       console.error('Failed to submit interview:', err);